@@ -0,0 +1,101 @@
+import openpyxl
+
+# Header is searched for in the first few rows only
+HEADER_SCAN_ROWS = 20
+ABSENT_STATUS = 'A-A'
+
+
+class AbsentReportError(Exception):
+    pass
+
+
+def _is_id_header(value):
+    text = str(value).upper()
+    return 'USER' in text and 'ID' in text
+
+
+def _clean_id(value):
+    # openpyxl returns numeric cells as int/float; match pandas' dtype=str text
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def find_header(ws, scan_rows=HEADER_SCAN_ROWS):
+    # Returns (header_row_number, id_col, status_col, id_header) with 1-based numbers
+    for row_number, row in enumerate(ws.iter_rows(max_row=scan_rows, values_only=True), start=1):
+        id_col = status_col = None
+        id_header = None
+        for col_number, value in enumerate(row, start=1):
+            if value is None:
+                continue
+            if id_col is None and _is_id_header(value):
+                id_col, id_header = col_number, value
+            elif str(value).strip().upper() == 'STATUS' and status_col is None:
+                status_col = col_number
+        if id_col is not None:
+            if status_col is None:
+                raise AbsentReportError("STATUS column not found next to the USER ID header!")
+            return row_number, id_col, status_col, id_header
+    raise AbsentReportError("USER ID column not found!")
+
+
+def _find_columns(ws, header_row, names):
+    # 1-based column numbers of the named headers (None when absent)
+    header = next(ws.iter_rows(min_row=header_row, max_row=header_row, values_only=True), ())
+    labels = [str(v).strip().upper() if v is not None else '' for v in header]
+    return [labels.index(name.upper()) + 1 if name.upper() in labels else None for name in names]
+
+
+def iter_report_rows(path, columns=(), sheet_name=None):
+    # Streams (user_id, status, *columns) tuples without loading the rest of the
+    # sheet. Only the columns between the first and last one needed are ever
+    # turned into cells; a requested column missing from the report reads as ''.
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name else wb.worksheets[0]
+        header_row, id_col, status_col, _ = find_header(ws)
+        extra_cols = _find_columns(ws, header_row, columns) if columns else []
+        wanted = [id_col, status_col] + [c for c in extra_cols if c is not None]
+        min_col, max_col = min(wanted), max(wanted)
+        id_pos, status_pos = id_col - min_col, status_col - min_col
+        extra_pos = [c - min_col if c is not None else None for c in extra_cols]
+        for row in ws.iter_rows(min_row=header_row + 1, min_col=min_col, max_col=max_col,
+                                values_only=True):
+            if not row:
+                continue
+            user_id = _clean_id(row[id_pos])
+            status = row[status_pos]
+            status = str(status).strip() if status is not None else ''
+            if user_id == '' and status == '':
+                continue
+            if not extra_pos:
+                yield user_id, status
+                continue
+            extras = tuple(str(row[pos]).strip() if pos is not None and row[pos] is not None else ''
+                           for pos in extra_pos)
+            yield (user_id, status) + extras
+    finally:
+        wb.close()
+
+
+def iter_id_status(path, sheet_name=None):
+    # Streams (user_id, status) pairs; only the USER ID..STATUS columns are read
+    return iter_report_rows(path, sheet_name=sheet_name)
+
+
+def scan_absent_report(path, status=ABSENT_STATUS, sheet_name=None):
+    # Returns (absent_ids, report_rows) in a single streaming pass
+    absent_ids = set()
+    report_rows = 0
+    for user_id, row_status in iter_id_status(path, sheet_name):
+        report_rows += 1
+        if row_status == status and user_id:
+            absent_ids.add(user_id)
+    return absent_ids, report_rows
+
+
+def read_absent_ids(path, status=ABSENT_STATUS, sheet_name=None):
+    return scan_absent_report(path, status, sheet_name)[0]
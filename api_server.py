@@ -0,0 +1,247 @@
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+
+from dashboard_data import file_signature, load_dashboard_data, load_pipeline_data
+from json_encoding import json_default
+from pipeline import ABSENT_CSV, CURRENT_CSV, ROSTER_EXCEL, latest_report
+from snapshot import SNAPSHOT_DIR, current_version, load_snapshot
+from stage_summary import has_backup
+
+# Small local JSON API for floor screens. One process holds the current data
+# in memory and every response body is serialized (and gzipped) once per data
+# version; polls with a matching If-None-Match get an empty 304.
+#   GET /api/summary   KPI totals, backup summary and coverage counts
+#   GET /api/stages    stage table (P, W/B, N/B, Present %)
+#   GET /api/absent    absent stations with backup columns
+#   GET /api/coverage  deployment plan
+#   GET /api/roster    full roster (for clients that rebuild the dashboard)
+#   GET /api/all       summary + stages + absent + coverage + roster + every absent ID in one body,
+#                      so a client never mixes two data versions
+# Data source, same order as the dashboard: watcher snapshot, Excel inputs, CSVs.
+
+HOST = "127.0.0.1"
+PORT = 8765
+REFRESH_INTERVAL = 2.0     # seconds between input checks
+KEEPALIVE_TIMEOUT = 15.0   # idle keep-alive connections are closed after this
+MAX_HEADER_BYTES = 16 * 1024
+
+log = logging.getLogger("api_server")
+
+
+def source_key(folder="."):
+    # Identifies the current input data; a new key means the data must be reloaded
+    snapshot_dir = os.path.join(folder, SNAPSHOT_DIR)
+    version = current_version(snapshot_dir)
+    if version is not None:
+        return ('snapshot', snapshot_dir, version)
+    roster_excel = os.path.join(folder, ROSTER_EXCEL)
+    report = latest_report(folder)
+    if os.path.exists(roster_excel) and report is not None:
+        return ('pipeline', roster_excel, file_signature(roster_excel), report, file_signature(report))
+    current_csv, absent_csv = os.path.join(folder, CURRENT_CSV), os.path.join(folder, ABSENT_CSV)
+    if os.path.exists(current_csv) and os.path.exists(absent_csv):
+        return ('csv', current_csv, file_signature(current_csv), absent_csv, file_signature(absent_csv))
+    return None
+
+
+def load_source(key):
+    kind = key[0]
+    if kind == 'snapshot':
+        return load_snapshot(key[1], key[2])
+    if kind == 'pipeline':
+        return load_pipeline_data(key[1], key[3])
+    return load_dashboard_data(key[1], key[3])
+
+
+def build_payloads(data, version):
+    # path -> JSON text; DataFrames go through to_json so Int64 <NA> becomes null
+    absent_df = data['absent_df']
+    with_backup = int(has_backup(absent_df).sum())
+    total = data['total']
+    header = {
+        'version': version,
+        'data_as_of': data.get('data_as_of'),
+        'report_date': data.get('report_date'),
+    }
+    summary = dict(header, **{
+        'total': total,
+        'present': data['present_count'],
+        'absent': data['absent_count'],
+        'present_pct': round(data['present_count'] / total * 100, 1) if total else 0,
+        'with_backup': with_backup,
+        'without_backup': data['absent_count'] - with_backup,
+        'covered': data['coverage']['covered'],
+        'uncovered': data['coverage']['uncovered'],
+        'stages': list(data.get('stages', [])),
+    })
+    frames = {
+        'stages': data['stage_df'].to_json(orient='records'),
+        'absent': absent_df.to_json(orient='records'),
+        'coverage': data['coverage']['plan'].to_json(orient='records'),
+        'roster': data['current_df'].to_json(orient='records'),
+    }
+    absent_ids = json.dumps(sorted(int(i) for i in data['absent_ids']))
+    summary_text = json.dumps(summary, default=json_default)
+    header_text = json.dumps(header, default=json_default)[:-1]
+
+    payloads = {'/api/summary': summary_text}
+    for name, records in frames.items():
+        payloads[f'/api/{name}'] = f'{header_text}, "{name}": {records}}}'
+    payloads['/api/all'] = (f'{{"summary": {summary_text}, "stages": {frames["stages"]}, '
+                            f'"absent": {frames["absent"]}, "coverage": {frames["coverage"]}, '
+                            f'"roster": {frames["roster"]}, "absent_ids": {absent_ids}}}')
+    return payloads
+
+
+class Response:
+    # A prebuilt body: plain and gzipped bytes plus a strong ETag
+    __slots__ = ('body', 'gzipped', 'etag')
+
+    def __init__(self, text):
+        self.body = text.encode('utf-8')
+        self.gzipped = gzip.compress(self.body, compresslevel=5)
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+
+
+class ApiServer:
+
+    def __init__(self, folder=".", host=HOST, port=PORT, refresh_interval=REFRESH_INTERVAL, allow_origin=None):
+        self.folder = folder
+        self.host = host
+        self.port = port
+        self.refresh_interval = refresh_interval
+        # The roster carries employee names and IDs: other web pages may only
+        # read the API when their origin is configured explicitly
+        self.allow_origin = allow_origin
+        self.key = None
+        self.responses = {}
+        self.requests = 0
+        self.not_modified = 0
+
+    def refresh(self):
+        # Reloads only when the inputs changed; returns True when new data is served
+        key = source_key(self.folder)
+        if key is None or key == self.key:
+            return False
+        data = load_source(key)
+        version = hashlib.sha1(repr(key).encode()).hexdigest()[:12]
+        self.responses = {path: Response(text) for path, text in build_payloads(data, version).items()}
+        self.key = key
+        log.info("serving %s data version %s", key[0], version)
+        return True
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                # Parsing runs in a worker thread so requests keep being answered
+                await asyncio.to_thread(self.refresh)
+            except Exception:
+                log.exception("refresh failed; still serving the previous data")
+
+    def _respond(self, writer, status, headers, body=b''):
+        lines = [f"HTTP/1.1 {status}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEPALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    self._respond(writer, "431 Request Header Fields Too Large", {'Content-Length': 0, 'Connection': 'close'})
+                    break
+                request_line, *header_lines = head.decode('latin-1').split("\r\n")
+                try:
+                    method, target, version = request_line.split(" ", 2)
+                except ValueError:
+                    self._respond(writer, "400 Bad Request", {'Content-Length': 0, 'Connection': 'close'})
+                    break
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version.upper() == 'HTTP/1.1')
+                self._serve(writer, method, target.split("?", 1)[0], headers, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def _serve(self, writer, method, path, headers, keep_alive):
+        self.requests += 1
+        common = {'Connection': 'keep-alive' if keep_alive else 'close'}
+        if self.allow_origin is not None:
+            common['Vary'] = 'Origin'
+            if headers.get('origin') == self.allow_origin:
+                common['Access-Control-Allow-Origin'] = self.allow_origin
+        if method not in ('GET', 'HEAD'):
+            self._respond(writer, "405 Method Not Allowed", dict(common, **{'Allow': 'GET, HEAD', 'Content-Length': 0}))
+            return
+        if path == '/healthz':
+            body = json.dumps({'ok': self.key is not None, 'requests': self.requests,
+                               'not_modified': self.not_modified}).encode()
+            self._respond(writer, "200 OK", dict(common, **{'Content-Type': 'application/json',
+                                                           'Content-Length': len(body)}), body)
+            return
+        response = self.responses.get(path)
+        if response is None:
+            status = "404 Not Found" if self.key is not None or not path.startswith('/api/') else "503 Service Unavailable"
+            self._respond(writer, status, dict(common, **{'Content-Length': 0}))
+            return
+
+        common.update({'ETag': response.etag, 'Cache-Control': 'no-cache',
+                       'Vary': 'Origin, Accept-Encoding' if self.allow_origin is not None else 'Accept-Encoding'})
+        if response.etag in [tag.strip() for tag in headers.get('if-none-match', '').split(',')]:
+            self.not_modified += 1
+            self._respond(writer, "304 Not Modified", common)
+            return
+        body = response.body
+        if 'gzip' in headers.get('accept-encoding', ''):
+            body = response.gzipped
+            common['Content-Encoding'] = 'gzip'
+        common.update({'Content-Type': 'application/json; charset=utf-8', 'Content-Length': len(body)})
+        self._respond(writer, "200 OK", common, body if method == 'GET' else b'')
+
+    async def serve(self):
+        self.refresh()
+        server = await asyncio.start_server(self.handle, self.host, self.port, limit=MAX_HEADER_BYTES,
+                                            backlog=1024)
+        log.info("listening on http://%s:%d", self.host, self.port)
+        refresher = asyncio.create_task(self._refresh_loop())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            refresher.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the dashboard numbers as JSON for floor screens")
+    parser.add_argument("folder", nargs="?", default=".", help="folder with the inputs / snapshots")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--refresh", type=float, default=REFRESH_INTERVAL, help="seconds between input checks")
+    parser.add_argument("--allow-origin", default=None,
+                        help="web page origin allowed to read the API from a browser, e.g. http://screens.local:8080")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    try:
+        asyncio.run(ApiServer(args.folder, args.host, args.port, args.refresh, args.allow_origin).serve())
+    except KeyboardInterrupt:
+        pass
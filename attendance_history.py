@@ -0,0 +1,180 @@
+import json
+import os
+import re
+import sys
+from datetime import date, datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from absent_reader import iter_id_status
+from roster import canonical_ids, load_roster
+
+# Append-only attendance history, one Parquet partition per report date:
+#   attendance_history/date=2026-01-19/part-0.parquet
+HISTORY_DIR = "attendance_history"
+
+ABSENT_STATUS = 'A-A'
+
+SCHEMA = pa.schema([
+    ('operator_id', pa.int64()),
+    ('area', pa.string()),
+    ('station', pa.string()),
+    ('status', pa.string()),       # report STATUS, or 'P' for roster operators not in the report
+    ('absent', pa.bool_()),
+    ('in_roster', pa.bool_()),
+])
+
+_REPORT_DATE = re.compile(r'(\d{4}-\d{2}-\d{2})')
+
+# Parquet metadata key with the (mtime_ns, size) of the report a day came from
+_SIGNATURE_KEY = b"report_signature"
+
+
+def report_date(path):
+    # absentReport 2026-01-19.xlsx -> date(2026, 1, 19)
+    match = _REPORT_DATE.search(os.path.basename(path))
+    if match is None:
+        raise ValueError(f"No YYYY-MM-DD date in report name '{os.path.basename(path)}'")
+    return datetime.strptime(match.group(1), '%Y-%m-%d').date()
+
+
+def _partition_dir(day, history_dir=HISTORY_DIR):
+    return os.path.join(history_dir, f"date={day.isoformat()}")
+
+
+def report_signature(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def stored_signature(day, history_dir=HISTORY_DIR):
+    # [mtime_ns, size] of the report a stored day was ingested from, or None
+    # when the day is not stored (or was ingested without a report file)
+    try:
+        metadata = pq.read_schema(os.path.join(_partition_dir(day, history_dir), 'part-0.parquet')).metadata or {}
+    except FileNotFoundError:
+        return None
+    signature = metadata.get(_SIGNATURE_KEY)
+    return json.loads(signature) if signature else None
+
+
+def ingested_dates(history_dir=HISTORY_DIR):
+    if not os.path.isdir(history_dir):
+        return []
+    days = []
+    for entry in os.listdir(history_dir):
+        if entry.startswith('date=') and os.path.exists(os.path.join(history_dir, entry, 'part-0.parquet')):
+            days.append(date.fromisoformat(entry[len('date='):]))
+    return sorted(days)
+
+
+def daily_statuses(roster, statuses):
+    # One row per roster operator plus any report-only IDs, for a single day
+    roster = roster[roster['ID'].notna()].drop_duplicates('ID')
+    report = pd.DataFrame(list(statuses), columns=['operator_id', 'status'])
+    report['operator_id'] = canonical_ids(report['operator_id'])
+    report = report[report['operator_id'].notna()].drop_duplicates('operator_id')
+
+    day = roster[['ID', 'Area', 'Station']].rename(
+        columns={'ID': 'operator_id', 'Area': 'area', 'Station': 'station'})
+    day = day.merge(report, on='operator_id', how='outer', indicator=True)
+    day['in_roster'] = day['_merge'] != 'right_only'
+    day['status'] = day['status'].fillna('P')
+    day['absent'] = day['status'] == ABSENT_STATUS
+    for col in ['area', 'station']:
+        day[col] = day[col].astype(object).where(day[col].notna(), '').map(str)
+    return day[[f.name for f in SCHEMA]]
+
+
+def ingest_report(path, roster, history_dir=HISTORY_DIR, replace=False, statuses=None):
+    # Adds one day to the history; returns False when that date is already stored.
+    # statuses can pass (user_id, status) pairs that were already read from the report.
+    day = report_date(path)
+    target_dir = _partition_dir(day, history_dir)
+    target = os.path.join(target_dir, 'part-0.parquet')
+    if os.path.exists(target) and not replace:
+        return False
+
+    table = pa.Table.from_pandas(daily_statuses(roster, statuses if statuses is not None else iter_id_status(path)), schema=SCHEMA,
+                                 preserve_index=False)
+    if os.path.exists(path):
+        # Lets callers skip re-ingesting an unchanged report (see stored_signature)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_SIGNATURE_KEY] = json.dumps(report_signature(path)).encode("utf-8")
+        table = table.replace_schema_metadata(metadata)
+    os.makedirs(target_dir, exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    pq.write_table(table, tmp)
+    os.replace(tmp, target)  # a partition is either complete or absent
+    return True
+
+
+def ingest_folder(folder, roster, history_dir=HISTORY_DIR):
+    # Incremental: only report dates not yet in the history are parsed
+    have = set(ingested_dates(history_dir))
+    added = []
+    for name in sorted(os.listdir(folder)):
+        if not (name.startswith('absentReport') and name.endswith('.xlsx')):
+            continue
+        try:
+            day = report_date(name)
+        except ValueError:
+            continue
+        if day in have:
+            continue
+        if ingest_report(os.path.join(folder, name), roster, history_dir):
+            added.append(day)
+            have.add(day)
+    return added
+
+
+def query(start=None, end=None, history_dir=HISTORY_DIR, columns=None):
+    # Per-operator daily rows for start <= date <= end (partition-pruned)
+    if not ingested_dates(history_dir):
+        empty = pa.schema([('date', pa.date32())] + list(SCHEMA)).empty_table()
+        return (empty.select(columns) if columns else empty).to_pandas()
+    dataset = ds.dataset(history_dir, format='parquet',
+                         partitioning=ds.partitioning(pa.schema([('date', pa.date32())]), flavor='hive'),
+                         exclude_invalid_files=True)
+    condition = None
+    if start is not None:
+        condition = ds.field('date') >= pa.scalar(start, pa.date32())
+    if end is not None:
+        upper = ds.field('date') <= pa.scalar(end, pa.date32())
+        condition = upper if condition is None else condition & upper
+    return dataset.to_table(filter=condition, columns=columns).to_pandas()
+
+
+def daily_attendance(start=None, end=None, history_dir=HISTORY_DIR):
+    rows = query(start, end, history_dir, columns=['date', 'absent', 'in_roster'])
+    rows = rows[rows['in_roster']]
+    daily = rows.groupby('date').agg(Total=('absent', 'size'), Absent=('absent', 'sum')).reset_index()
+    daily['Present'] = daily['Total'] - daily['Absent']
+    daily['Attendance %'] = (daily['Present'] / daily['Total'] * 100).round(1)
+    return daily
+
+
+def monthly_attendance(start=None, end=None, history_dir=HISTORY_DIR):
+    # Month, report days, average present operators and attendance % per month
+    daily = daily_attendance(start, end, history_dir)
+    if daily.empty:
+        return pd.DataFrame(columns=['Month', 'Days', 'Present MP', 'Attendance %'])
+    daily['Month'] = pd.to_datetime(daily['date']).dt.to_period('M')
+    monthly = daily.groupby('Month').agg(
+        Days=('date', 'size'), Present=('Present', 'sum'), Total=('Total', 'sum')).reset_index()
+    monthly['Present MP'] = (monthly['Present'] / monthly['Days']).round().astype(int)
+    monthly['Attendance %'] = (monthly['Present'] / monthly['Total'] * 100).round(1)
+    monthly['Month'] = monthly['Month'].dt.strftime('%b %Y')
+    return monthly[['Month', 'Days', 'Present MP', 'Attendance %']]
+
+
+if __name__ == "__main__":
+    # python attendance_history.py [report folder] [roster csv]
+    folder = sys.argv[1] if len(sys.argv) > 1 else "."
+    roster_csv = sys.argv[2] if len(sys.argv) > 2 else "current_employees.csv"
+    added = ingest_folder(folder, load_roster(roster_csv))
+    print(f"Ingested {len(added)} new day(s): {', '.join(d.isoformat() for d in added) or '-'}")
+    print(monthly_attendance().to_string(index=False))
@@ -0,0 +1,148 @@
+from collections import deque
+
+import pandas as pd
+
+from roster import backup_slots, canonical_ids
+
+# Effective coverage: which absent stations can really be staffed today.
+# Every absent station is matched to at most one *present* multi-skilled
+# operator and every operator covers at most one station (maximum bipartite
+# matching), preferring B1 over B2 ... over B7 where there is a choice.
+# Present main operators are already staffing their own station and are not
+# available as backups (pipeline.aggregate passes them as unavailable_ids).
+
+PLAN_COLUMNS = ['Area', 'Station', 'Name', 'ID', 'Backup', 'Backup ID', 'Priority']
+
+
+def _clean(value):
+    if value is None or value is pd.NA or (isinstance(value, float) and value != value):
+        return ''
+    return str(value).strip()
+
+
+def skill_edges(absent_stations, absent_ids, unavailable_ids=()):
+    # Adjacency list per absent station: [(operator_id, operator_name, priority), ...]
+    # in priority order, keeping only backups who are present and not reserved.
+    # IDs are compared in canonical Int64 form (see roster.canonical_ids).
+    blocked = set(canonical_ids(list(absent_ids) + list(unavailable_ids)).dropna().tolist())
+    edges = []
+    slots = backup_slots(absent_stations)
+    columns = {}
+    for _, name_col, id_col in slots:
+        columns[name_col] = absent_stations[name_col].tolist()
+        ids = canonical_ids(absent_stations[id_col])
+        columns[id_col] = ids.astype(object).where(ids.notna(), None).tolist()
+    for row in range(len(absent_stations)):
+        candidates = []
+        seen = set()
+        for k, name_col, id_col in slots:
+            op_id = columns[id_col][row]
+            if op_id is None or op_id in blocked or op_id in seen:
+                continue
+            seen.add(op_id)
+            candidates.append((op_id, _clean(columns[name_col][row]), k))
+        edges.append(candidates)
+    return edges
+
+
+def max_matching(edges):
+    # Hopcroft-Karp over station -> operator edges. A greedy pass by priority
+    # (all B1 edges first, then B2, ...) seeds the matching so preferred
+    # backups are kept whenever that does not cost coverage.
+    n = len(edges)
+    match_station = [None] * n       # station -> edge index
+    match_operator = {}              # operator id -> station
+
+    max_priority = max((p for cand in edges for _, _, p in cand), default=0)
+    for priority in range(1, max_priority + 1):
+        for s in range(n):
+            if match_station[s] is not None:
+                continue
+            for e, (op_id, _, p) in enumerate(edges[s]):
+                if p == priority and op_id not in match_operator:
+                    match_station[s] = e
+                    match_operator[op_id] = s
+                    break
+
+    INF = float('inf')
+    while True:
+        # BFS layers from free stations
+        dist = [INF] * n
+        queue = deque()
+        for s in range(n):
+            if match_station[s] is None and edges[s]:
+                dist[s] = 0
+                queue.append(s)
+        found = False
+        while queue:
+            s = queue.popleft()
+            for op_id, _, _ in edges[s]:
+                t = match_operator.get(op_id)
+                if t is None:
+                    found = True
+                elif dist[t] == INF:
+                    dist[t] = dist[s] + 1
+                    queue.append(t)
+        if not found:
+            break
+
+        # Iterative DFS along the layers, augmenting vertex-disjoint paths
+        next_edge = [0] * n
+        for root in range(n):
+            if match_station[root] is not None or dist[root] != 0:
+                continue
+            stack = [root]
+            while stack:
+                s = stack[-1]
+                if next_edge[s] >= len(edges[s]):
+                    dist[s] = INF  # dead end for this phase
+                    stack.pop()
+                    continue
+                e = next_edge[s]
+                op_id = edges[s][e][0]
+                t = match_operator.get(op_id)
+                if t is None:
+                    # Free operator reached: flip the path back to the root
+                    for station in reversed(stack):
+                        e = next_edge[station]
+                        op_id = edges[station][e][0]
+                        match_station[station] = e
+                        match_operator[op_id] = station
+                    break
+                if dist[t] == dist[s] + 1:
+                    stack.append(t)
+                else:
+                    next_edge[s] += 1
+    return match_station
+
+
+def compute_coverage(absent_stations, absent_ids, unavailable_ids=()):
+    # absent_stations: roster rows whose main operator is absent.
+    # absent_ids: every absent operator ID for the day (main and backups).
+    # unavailable_ids: present operators that must not be moved, e.g. the main
+    # operators of staffed stations.
+    absent_stations = absent_stations.reset_index(drop=True)
+    edges = skill_edges(absent_stations, absent_ids, unavailable_ids)
+    matching = max_matching(edges)
+
+    chosen = [edges[s][e] if e is not None else (None, '', None) for s, e in enumerate(matching)]
+    plan_df = pd.DataFrame({
+        col: absent_stations[col] if col in absent_stations.columns else ''
+        for col in ['Area', 'Station', 'Name', 'ID']
+    })
+    plan_df['Backup'] = [name for _, name, _ in chosen]
+    plan_df['Backup ID'] = canonical_ids([op_id for op_id, _, _ in chosen])
+    plan_df['Priority'] = [f'B{p}' if p else '' for _, _, p in chosen]
+    plan_df = plan_df[PLAN_COLUMNS]
+
+    covered_mask = plan_df['Backup ID'].notna().to_numpy()
+    by_area = pd.DataFrame({'Area': plan_df['Area'], 'Covered': covered_mask, 'Uncovered': ~covered_mask})
+    by_area = by_area.groupby('Area', sort=False, observed=True)[['Covered', 'Uncovered']].sum().reset_index()
+
+    covered = int(covered_mask.sum())
+    return {
+        'covered': covered,
+        'uncovered': len(plan_df) - covered,
+        'plan': plan_df,
+        'by_area': by_area,
+    }
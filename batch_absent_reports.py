@@ -0,0 +1,106 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from absent_reader import ABSENT_STATUS, iter_id_status
+from attendance_history import ingest_report, report_date
+from daily_snapshots import save_day
+from pipeline import aggregate, discover_reports, match_absent
+from roster import canonical_ids, load_roster
+
+# Batch version of generate_absent_csv.py: every "absentReport YYYY-MM-DD.xlsx"
+# in a folder is parsed in parallel, matched against one shared roster, and
+# written as per-day CSVs plus one combined long-format file. Reports that
+# cannot be read are skipped and listed at the end.
+
+
+def parse_report(path):
+    # Runs in a worker process; only the (ID, STATUS) pairs travel back.
+    # A bad file (not a workbook, locked by Excel, no USER ID header ...)
+    # comes back as an error message so the rest of the batch still runs.
+    try:
+        return path, list(iter_id_status(path)), None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+def run_batch(folder, roster_csv, out_dir, workers=None, history=False, daily=False):
+    roster = load_roster(roster_csv)
+    roster = roster[roster['ID'].notna()]
+
+    reports = discover_reports(folder)
+    if not reports:
+        return pd.DataFrame(), [], []
+
+    os.makedirs(out_dir, exist_ok=True)
+    summary = []
+    frames = []
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, statuses, error in pool.map(parse_report, reports):
+            if error is not None:
+                failed.append((path, error))
+                continue
+            day = report_date(path)
+            absent_ids = canonical_ids([user_id for user_id, status in statuses if status == ABSENT_STATUS])
+            absent_ids = set(absent_ids.dropna().tolist())
+            absent_final = match_absent(roster, absent_ids)
+            absent_final.to_csv(os.path.join(out_dir, f"actual_absent_manpower {day.isoformat()}.csv"), index=False)
+            frames.append(absent_final.assign(Date=day.isoformat()))
+            summary.append({
+                'Date': day.isoformat(),
+                'Report rows': len(statuses),
+                'Absent in report': len(absent_ids),
+                'Matched': len(absent_final),
+                'Present': len(roster) - len(absent_final),
+            })
+            if history:
+                ingest_report(path, roster, statuses=statuses)
+            if daily:
+                result = aggregate(roster, absent_final, absent_ids)
+                result['report_path'] = path
+                result['data_as_of'] = datetime.fromtimestamp(os.path.getmtime(path))
+                save_day(result, day)
+
+    if not frames:
+        return pd.DataFrame(), summary, failed
+    combined = pd.concat(frames, ignore_index=True)
+    combined = combined[['Date'] + [c for c in combined.columns if c != 'Date']]
+    combined.to_csv(os.path.join(out_dir, "absent_long.csv"), index=False)
+    return combined, summary, failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate absent manpower CSVs for a folder of daily reports")
+    parser.add_argument("folder", nargs="?", default=".", help="folder containing absentReport *.xlsx files")
+    parser.add_argument("--roster", default="current_employees.csv")
+    parser.add_argument("--out", default="absent_batch", help="output folder")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--history", action="store_true", help="also add each day to the attendance history")
+    parser.add_argument("--daily", action="store_true", help="also save a daily dashboard snapshot per day")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.roster):
+        print(f"ERROR: '{args.roster}' not found! Generate it first from Excel.")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    combined, summary, failed = run_batch(args.folder, args.roster, args.out, args.workers, args.history, args.daily)
+    if not summary and not failed:
+        print(f"No absentReport *.xlsx files found in '{args.folder}'")
+        sys.exit(1)
+
+    if summary:
+        print(pd.DataFrame(summary).to_string(index=False))
+        print(f"\n{len(summary)} report(s), {len(combined)} absent rows -> '{os.path.join(args.out, 'absent_long.csv')}'"
+              f" in {time.perf_counter() - start:.1f}s")
+    if failed:
+        print(f"\nERROR: {len(failed)} report(s) skipped:", file=sys.stderr)
+        for path, error in failed:
+            print(f"  {path}: {error}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,103 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+from api_server import HOST, PORT, ApiServer
+
+# Many floor screens polling api_server.py at once: every client keeps one
+# keep-alive connection and polls with If-None-Match like a browser would.
+#   python benchmarks/bench_api.py --clients 300 --seconds 10
+#   python benchmarks/bench_api.py --url 127.0.0.1:8765   (an already running server)
+# Without --url the server runs in the same event loop as the clients, so the
+# latencies include client-side scheduling.
+
+CLIENTS = 300
+SECONDS = 10
+POLL_INTERVAL = 0.5   # seconds between polls of one screen
+PATHS = ['/api/summary', '/api/stages', '/api/absent']
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, *lines = head.decode('latin-1').split("\r\n")
+    headers = {}
+    for line in lines:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length:
+        await reader.readexactly(length)
+    return int(status_line.split(" ")[1]), headers.get('etag')
+
+
+async def poller(host, port, path, deadline, interval, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    etag = None
+    try:
+        while time.perf_counter() < deadline:
+            request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+            if etag:
+                request += f"If-None-Match: {etag}\r\n"
+            start = time.perf_counter()
+            writer.write((request + "\r\n").encode('latin-1'))
+            status, new_etag = await _read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+            etag = new_etag or etag
+            await asyncio.sleep(interval)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, clients, seconds, interval):
+    latencies, statuses = [], {}
+    deadline = time.perf_counter() + seconds
+    # Spread the first polls so the screens are not in lock-step
+    async def staggered(i):
+        await asyncio.sleep(interval * i / clients)
+        await poller(host, port, PATHS[i % len(PATHS)], deadline, interval, latencies, statuses)
+    await asyncio.gather(*(staggered(i) for i in range(clients)))
+    return latencies, statuses
+
+
+async def main(args):
+    server_task = None
+    host, port = HOST, args.port
+    if args.url:
+        host, _, port = args.url.partition(":")
+        port = int(port or PORT)
+    else:
+        server = ApiServer(args.folder, host, port)
+        server_task = asyncio.create_task(server.serve())
+        await asyncio.sleep(0.5)
+        while not server.responses:
+            await asyncio.sleep(0.1)
+    try:
+        latencies, statuses = await run_load(host, port, args.clients, args.seconds, args.interval)
+    finally:
+        if server_task:
+            server_task.cancel()
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    print(f"{args.clients} clients x {args.seconds}s, one poll every {args.interval}s each")
+    print(f"{len(latencies)} requests ({len(latencies) / args.seconds:.0f}/s), statuses {statuses}")
+    print(f"latency ms: p50 {pct(0.50):.2f}  p95 {pct(0.95):.2f}  p99 {pct(0.99):.2f}  "
+          f"max {latencies[-1] * 1000:.2f}  mean {statistics.mean(latencies) * 1000:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test api_server.py with many polling screens")
+    parser.add_argument("--clients", type=int, default=CLIENTS)
+    parser.add_argument("--seconds", type=float, default=SECONDS)
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL)
+    parser.add_argument("--folder", default=ROOT, help="inputs for the in-process server")
+    parser.add_argument("--port", type=int, default=PORT + 1)
+    parser.add_argument("--url", default=None, help="host:port of a running server instead")
+    args = parser.parse_args()
+    asyncio.run(main(args))
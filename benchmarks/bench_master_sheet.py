@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import synthetic_data
+from master_sheet import extract_operators
+
+N_ROWS = 100_000
+
+
+def legacy_extract(df_raw):
+    # The original iterrows() loop from Operator_details.py, kept for comparison
+    data = []
+    for _, row in df_raw.iterrows():
+        area = row.iloc[0] if pd.notna(row.iloc[0]) else ''
+        station = row.iloc[1] if pd.notna(row.iloc[1]) else ''
+        main_name = row.iloc[3] if len(row) > 3 and pd.notna(row.iloc[3]) else ''
+        main_id = row.iloc[4] if len(row) > 4 and pd.notna(row.iloc[4]) else ''
+        entry = {
+            'Area': area,
+            'Station': station,
+            'Name': str(main_name) if pd.notna(main_name) else '',
+            'ID': str(main_id) if pd.notna(main_id) else '',
+        }
+        for k, start in enumerate(range(8, 39, 5), start=1):
+            entry[f'Multi_OP{k}_Name'] = ''
+            entry[f'Multi_OP{k}_ID'] = ''
+            if len(row) > start + 1:
+                entry[f'Multi_OP{k}_Name'] = str(row.iloc[start]) if pd.notna(row.iloc[start]) else ''
+                entry[f'Multi_OP{k}_ID'] = str(row.iloc[start + 1]) if pd.notna(row.iloc[start + 1]) else ''
+        data.append(entry)
+    final_df = pd.DataFrame(data)
+    return final_df[(final_df['Name'] != '') | (final_df['ID'] != '')].reset_index(drop=True)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else N_ROWS
+    # One station per row, 43 columns with 7 multi-skill blocks
+    df_raw = synthetic_data.raw_master_sheet(n_rows, n_rows)
+    print(f"Synthetic Master Sheet: {df_raw.shape[0]} rows x {df_raw.shape[1]} columns")
+
+    new_df, new_time = timed(extract_operators, df_raw)
+    old_df, old_time = timed(legacy_extract, df_raw)
+
+    pd.testing.assert_frame_equal(new_df, old_df, check_dtype=False)
+    print(f"iterrows loop : {old_time:.3f}s")
+    print(f"vectorized    : {new_time:.3f}s")
+    print(f"Speedup       : {old_time / new_time:.1f}x (outputs identical)")
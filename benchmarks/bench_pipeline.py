@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import synthetic_data
+from attendance_history import ingest_report, monthly_attendance
+from backup_coverage import compute_coverage
+from dashboard_data import absent_page, absent_table
+from excel_cache import CACHE_DIR
+from pipeline import STAGES, absent_ids_from, aggregate, match_absent, parse_absences, parse_roster, staffed_ids
+from risk import simulate
+from roster import load_roster
+from skill_index import SkillIndex
+from snapshot import load_snapshot, publish_snapshot
+from stage_summary import aggregate_stages
+
+# Times every stage of roster -> absent -> dashboard on synthetic inputs and
+# writes the timings to JSON, so two runs (or two commits) can be compared:
+#   python benchmarks/bench_pipeline.py --stations 5000 --operators 6000
+#   python benchmarks/bench_pipeline.py --compare benchmarks/results/<earlier>.json
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+REPEAT = 3
+
+
+def timed(fn, repeat, setup=None):
+    # Returns (last result, run times in seconds)
+    runs = []
+    result = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        result = fn()
+        runs.append(time.perf_counter() - start)
+    return result, runs
+
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def run_benchmark(folder, repeat=REPEAT):
+    roster_path = os.path.join(folder, synthetic_data.ROSTER_EXCEL)
+    reports = sorted(p for p in os.listdir(folder) if p.startswith('absentReport'))
+    reports = [os.path.join(folder, p) for p in reports]
+    report = reports[-1]
+    stages = {}
+
+    # Operator_details.py: Master Sheet -> roster (cold = no Parquet cache yet)
+    clear_cache = lambda: shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    roster, stages['excel_parse_cold'] = timed(lambda: parse_roster(roster_path), repeat, clear_cache)
+    _, stages['excel_parse_cached'] = timed(lambda: parse_roster(roster_path), repeat)
+
+    csv_path = os.path.join(folder, 'current_employees.csv')
+    _, stages['roster_csv_write'] = timed(lambda: roster.to_csv(csv_path, index=False), repeat)
+    _, stages['roster_csv_load'] = timed(lambda: load_roster(csv_path), repeat)
+
+    # generate_absent_csv.py: report -> IDs -> matched absent rows
+    statuses, stages['absent_parse'] = timed(lambda: parse_absences(report), repeat)
+    absent_ids = absent_ids_from(statuses)
+    absent_df, stages['id_match'] = timed(lambda: match_absent(roster, absent_ids), repeat)
+
+    # manpower_dash_dashboard.py: aggregation and table preparation
+    current = roster[roster['Area'].isin(STAGES)]
+    absent = absent_df[absent_df['Area'].isin(STAGES)]
+    staffed = staffed_ids(roster, absent_ids)
+    _, stages['stage_aggregate'] = timed(lambda: aggregate_stages(current, absent, STAGES), repeat)
+    _, stages['coverage'] = timed(lambda: compute_coverage(absent, absent_ids, staffed), repeat)
+    _, stages['skill_index'] = timed(lambda: SkillIndex.from_roster(current), repeat)
+    (rows, css), stages['table_prep'] = timed(lambda: absent_table(absent), repeat)
+    _, stages['table_page'] = timed(lambda: absent_page(rows, css, sort_by='Station')[0].to_html(), repeat)
+    _, stages['risk_simulation'] = timed(lambda: simulate(current), repeat)
+
+    # watcher.py publishing and a dashboard worker loading the Arrow snapshot
+    snapshot_dir = os.path.join(folder, 'snapshots')
+    result = aggregate(roster, absent_df, absent_ids)
+    version, stages['snapshot_publish'] = timed(lambda: publish_snapshot(result, snapshot_dir), repeat)
+    _, stages['snapshot_load'] = timed(lambda: load_snapshot(snapshot_dir, version), repeat)
+
+    # Attendance history over all generated days
+    history_dir = os.path.join(folder, 'attendance_history')
+    clear_history = lambda: shutil.rmtree(history_dir, ignore_errors=True)
+    _, stages['history_ingest'] = timed(lambda: [ingest_report(p, roster, history_dir) for p in reports],
+                                        repeat, clear_history)
+    _, stages['history_monthly'] = timed(lambda: monthly_attendance(history_dir=history_dir), repeat)
+
+    counts = {
+        'roster_rows': len(roster),
+        'report_rows': len(statuses),
+        'absent_ids': len(absent_ids),
+        'absent_rows': len(absent_df),
+        'reports': len(reports),
+    }
+    return stages, counts
+
+
+def summarize(stages):
+    return {name: {'min_s': round(min(runs), 6), 'median_s': round(statistics.median(runs), 6),
+                   'runs': [round(r, 6) for r in runs]}
+            for name, runs in stages.items()}
+
+
+def print_results(results, baseline=None):
+    print(f"{'stage':<20}{'min s':>10}{'median s':>10}" + (f"{'baseline':>10}{'speedup':>9}" if baseline else ""))
+    for name, timing in results['stages'].items():
+        line = f"{name:<20}{timing['min_s']:>10.4f}{timing['median_s']:>10.4f}"
+        if baseline and name in baseline['stages']:
+            before = baseline['stages'][name]['min_s']
+            line += f"{before:>10.4f}{before / timing['min_s'] if timing['min_s'] else float('inf'):>8.2f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the roster -> absent -> dashboard pipeline")
+    parser.add_argument("--operators", type=int, default=synthetic_data.N_OPERATORS)
+    parser.add_argument("--stations", type=int, default=synthetic_data.N_STATIONS)
+    parser.add_argument("--backup-density", type=float, default=synthetic_data.BACKUP_DENSITY)
+    parser.add_argument("--days", type=int, default=synthetic_data.N_DAYS)
+    parser.add_argument("--absent-rate", type=float, default=synthetic_data.ABSENT_RATE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--output", default=None, help="JSON file (default: benchmarks/results/pipeline-<time>.json)")
+    parser.add_argument("--compare", default=None, help="earlier JSON result to compare against")
+    args = parser.parse_args()
+
+    params = {'operators': args.operators, 'stations': args.stations, 'backup_density': args.backup_density,
+              'days': args.days, 'absent_rate': args.absent_rate, 'seed': args.seed, 'repeat': args.repeat}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        synthetic_data.generate(tmp, args.operators, args.stations, args.backup_density,
+                                args.days, args.absent_rate, seed=args.seed)
+        generate_s = time.perf_counter() - start
+        # The Excel cache lives in the working directory; keep it inside tmp
+        os.chdir(tmp)
+        try:
+            stages, counts = run_benchmark(tmp, args.repeat)
+        finally:
+            os.chdir(cwd)
+
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'params': params,
+        'counts': counts,
+        'generate_s': round(generate_s, 3),
+        'stages': summarize(stages),
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"pipeline-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=1)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('params') != params:
+            print(f"NOTE: baseline was run with different parameters: {baseline.get('params')}")
+    print(f"Synthetic inputs: {counts['roster_rows']} roster rows, {counts['report_rows']} report rows x "
+          f"{counts['reports']} days, {counts['absent_rows']} absent stations")
+    print_results(results, baseline)
+    print(f"Results written to '{output}'")
@@ -0,0 +1,147 @@
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from master_sheet import BACKUP_FIRST_COL, BACKUP_STRIDE, MIN_BACKUP_SLOTS
+from pipeline import ROSTER_EXCEL, ROSTER_SHEET, STAGES
+
+# Deterministic synthetic inputs shaped like the real files: a Master Sheet
+# workbook (3 title/header rows, 8 station columns, 7 five-column multi-skill
+# blocks) and one "absentReport YYYY-MM-DD.xlsx" per day. The same seed always
+# produces the same IDs, skills and statuses.
+
+N_OPERATORS = 2_000
+N_STATIONS = 1_500
+BACKUP_DENSITY = 0.6     # chance that a station has a Multi Skill OP1; halves, thirds, ... for later slots
+N_DAYS = 5
+ABSENT_RATE = 0.08
+START_DATE = date(2026, 1, 19)
+
+FIRST_ID = 200_000
+N_COLUMNS = BACKUP_FIRST_COL + BACKUP_STRIDE * MIN_BACKUP_SLOTS
+
+REPORT_HEADER = ['S.NO', 'USER ID', 'PAYCODE', 'NAME', 'F/H Name', 'DEPARTMENT', 'DESIGNATION', 'CADRE',
+                 'SHIFT', 'IN TIME', 'OUT TIME', 'TOTAL TIME', 'STATUS', 'PAID STATUS', 'OT.', 'LATE ARR.',
+                 'EARLY GOING.', 'EARLY ARR.', 'DESIG1', 'GENDER', 'DOJ', 'SUB-DEPT', 'DIVISION', 'SUB-DIV',
+                 'LOCATION', 'COMPANY', 'CATEGORY', 'LINE', 'EARLY ARR.']
+SHIFTS = ['G33', 'A', 'B']
+LINES = ['LINE NO-01', 'LINE NO-02', 'LINE NO-03', 'TG-04']
+
+
+def operator_ids(n_operators=N_OPERATORS, seed=0):
+    # Unique, shuffled six-digit IDs like the HR system's
+    rng = np.random.default_rng(seed)
+    return FIRST_ID + rng.permutation(n_operators * 3)[:n_operators]
+
+
+def roster_rows(n_operators=N_OPERATORS, n_stations=N_STATIONS, backup_density=BACKUP_DENSITY, seed=0):
+    # One Master Sheet row per station; main operators are the first
+    # n_stations IDs (reused round-robin if there are fewer operators)
+    rng = np.random.default_rng(seed + 1)
+    ids = operator_ids(n_operators, seed)
+    areas = np.sort(rng.choice(len(STAGES), n_stations, p=[0.2, 0.15, 0.35, 0.15, 0.15]))
+
+    rows = []
+    for i in range(n_stations):
+        row = [None] * N_COLUMNS
+        main = ids[i % n_operators]
+        row[0] = STAGES[areas[i]]
+        row[1] = f"{STAGES[areas[i]]} Station {i + 1}"
+        row[2] = 1
+        row[3] = f"Operator {main}"
+        row[4] = int(main)
+        for k in range(MIN_BACKUP_SLOTS):
+            if rng.random() < backup_density / (k + 1):
+                backup = ids[rng.integers(n_operators)]
+                col = BACKUP_FIRST_COL + k * BACKUP_STRIDE
+                row[col] = f"Operator {backup}"
+                row[col + 1] = int(backup)
+        rows.append(row)
+    return rows
+
+
+def raw_master_sheet(n_operators=N_OPERATORS, n_stations=N_STATIONS, backup_density=BACKUP_DENSITY, seed=0):
+    # The station rows as pd.read_excel(header=None) returns them below the header
+    rows = roster_rows(n_operators, n_stations, backup_density, seed)
+    return pd.DataFrame(rows, columns=[f'col{c}' for c in range(N_COLUMNS)])
+
+
+def write_master_sheet(path, n_operators=N_OPERATORS, n_stations=N_STATIONS,
+                       backup_density=BACKUP_DENSITY, seed=0):
+    wb = openpyxl.Workbook(write_only=True)
+    wb.create_sheet('T2 ')
+    ws = wb.create_sheet(ROSTER_SHEET)
+
+    titles = [' '] + [None] * (N_COLUMNS - 1)
+    dates = [None] * N_COLUMNS
+    header = ['Area', 'Stations', 'Station QPL', 'NAME ', 'ID', 'DOJ', 'Date of Certification',
+              'How many days work in station']
+    for k in range(MIN_BACKUP_SLOTS):
+        col = BACKUP_FIRST_COL + k * BACKUP_STRIDE
+        titles[col] = f"Multi Skill OP{k + 1}"
+        dates[col] = '13/12/2025'
+    header += ['Name', 'ID', 'DOJ', 'Date of Certification', 'How many days work in station'] * MIN_BACKUP_SLOTS
+    ws.append(titles)
+    ws.append(dates)
+    ws.append(header)
+    for row in roster_rows(n_operators, n_stations, backup_density, seed):
+        ws.append(row)
+    wb.save(path)
+
+
+def write_absent_report(path, day, n_operators=N_OPERATORS, absent_rate=ABSENT_RATE, seed=0):
+    # Every operator appears once; absent_rate of them are 'A-A'
+    rng = np.random.default_rng([seed, day.toordinal()])
+    ids = operator_ids(n_operators, seed)
+    absent = rng.random(n_operators) < absent_rate
+    shifts = rng.integers(len(SHIFTS), size=n_operators)
+    lines = rng.integers(len(LINES), size=n_operators)
+    female = rng.random(n_operators) < 0.85
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet('Sheet1')
+    ws.append(REPORT_HEADER)
+    for i in range(n_operators):
+        status = 'A-A' if absent[i] else 'P-P'
+        ws.append([i + 1, int(ids[i]), int(ids[i]), f"OPERATOR {ids[i]} ", 'FATHER', 'PRODUCTION COMPAL',
+                   'OPERATOR', 'UNSKILLED', SHIFTS[shifts[i]], None, None, None, status, status, None, None,
+                   None, None, '-', 'female' if female[i] else 'male', '01/01/2025', 'COMPAL OSS', 'GENERAL',
+                   '-', 'MOBILE SECTOR-68', 'CONTRACTOR', 'WORKER', LINES[lines[i]], f"{day:%d/%m/%Y}"])
+    wb.save(path)
+
+
+def generate(folder, n_operators=N_OPERATORS, n_stations=N_STATIONS, backup_density=BACKUP_DENSITY,
+             n_days=N_DAYS, absent_rate=ABSENT_RATE, start=START_DATE, seed=0):
+    # Roster workbook + n_days daily reports in folder; returns (roster_path, report_paths)
+    os.makedirs(folder, exist_ok=True)
+    roster_path = os.path.join(folder, ROSTER_EXCEL)
+    write_master_sheet(roster_path, n_operators, n_stations, backup_density, seed)
+    reports = []
+    for d in range(n_days):
+        day = start + timedelta(days=d)
+        path = os.path.join(folder, f"absentReport {day:%Y-%m-%d}.xlsx")
+        write_absent_report(path, day, n_operators, absent_rate, seed)
+        reports.append(path)
+    return roster_path, reports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic roster workbook and daily absentReports")
+    parser.add_argument("folder")
+    parser.add_argument("--operators", type=int, default=N_OPERATORS)
+    parser.add_argument("--stations", type=int, default=N_STATIONS)
+    parser.add_argument("--backup-density", type=float, default=BACKUP_DENSITY)
+    parser.add_argument("--days", type=int, default=N_DAYS)
+    parser.add_argument("--absent-rate", type=float, default=ABSENT_RATE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    roster_path, reports = generate(args.folder, args.operators, args.stations, args.backup_density,
+                                    args.days, args.absent_rate, seed=args.seed)
+    print(f"Wrote '{roster_path}' ({args.stations} stations, {args.operators} operators) and {len(reports)} reports")
@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+import shutil
+from datetime import date, datetime
+
+import pandas as pd
+
+from json_encoding import json_default
+from stage_summary import has_backup
+
+# One materialized snapshot per processed day, so past days open without the
+# Excel inputs or any recomputation:
+#   daily_snapshots/index.json                        KPI totals per day (date -> summary)
+#   daily_snapshots/day=2026-01-19/stage_df.parquet
+#   daily_snapshots/day=2026-01-19/absent_df.parquet
+#   daily_snapshots/day=2026-01-19/coverage_plan.parquet
+# Re-processing a day replaces its snapshot.
+DAILY_DIR = "daily_snapshots"
+INDEX_FILE = "index.json"
+
+_FRAMES = {
+    'stage_df': 'stage_df.parquet',
+    'absent_df': 'absent_df.parquet',
+    'coverage_plan': 'coverage_plan.parquet',
+}
+
+
+def day_path(day, root=DAILY_DIR):
+    return os.path.join(root, f"day={day.isoformat()}")
+
+
+def read_index(root=DAILY_DIR):
+    try:
+        with open(os.path.join(root, INDEX_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'days': {}}
+
+
+def saved_days(root=DAILY_DIR, index=None):
+    index = index or read_index(root)
+    return sorted(date.fromisoformat(d) for d in index['days'])
+
+
+def save_day(result, day=None, root=DAILY_DIR):
+    # result is pipeline.aggregate()-shaped; day defaults to its report date
+    day = day or result.get('report_date') or result['data_as_of'].date()
+    target = day_path(day, root)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    frames = {
+        'stage_df': result['stage_df'],
+        'absent_df': result['absent_df'],
+        'coverage_plan': result['coverage']['plan'],
+    }
+    for key, name in _FRAMES.items():
+        frames[key].to_parquet(os.path.join(tmp, name), index=False)
+
+    # A directory cannot be os.replace()d over a non-empty one: move the old
+    # day aside first, then swap the new one in
+    old = f"{target}.{os.getpid()}.old"
+    if os.path.exists(target):
+        os.replace(target, old)
+    os.replace(tmp, target)
+    shutil.rmtree(old, ignore_errors=True)
+
+    with_backup = int(has_backup(result['absent_df']).sum())
+    index = read_index(root)
+    index['days'][day.isoformat()] = {
+        'total': result['total'],
+        'absent_count': result['absent_count'],
+        'present_count': result['present_count'],
+        'with_backup': with_backup,
+        'without_backup': result['absent_count'] - with_backup,
+        'covered': result['coverage']['covered'],
+        'uncovered': result['coverage']['uncovered'],
+        'stages': list(result.get('stages', [])),
+        'report_path': result.get('report_path'),
+        'data_as_of': result.get('data_as_of'),
+        'saved_at': datetime.now(),
+    }
+    index['days'] = dict(sorted(index['days'].items()))
+    index_path = os.path.join(root, INDEX_FILE)
+    tmp_index = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_index, "w", encoding="utf-8") as f:
+        json.dump(index, f, default=json_default, indent=1)
+    os.replace(tmp_index, index_path)
+    return day
+
+
+def load_day(day, root=DAILY_DIR, index=None):
+    # The saved frames plus the index totals; nothing is recomputed
+    index = index or read_index(root)
+    meta = index['days'][day.isoformat()]
+    source = day_path(day, root)
+    frames = {key: pd.read_parquet(os.path.join(source, name)) for key, name in _FRAMES.items()}
+    return {
+        'stage_df': frames['stage_df'],
+        'absent_df': frames['absent_df'],
+        'coverage': {
+            'covered': meta['covered'],
+            'uncovered': meta['uncovered'],
+            'plan': frames['coverage_plan'],
+        },
+        'total': meta['total'],
+        'absent_count': meta['absent_count'],
+        'present_count': meta['present_count'],
+        'with_backup': meta['with_backup'],
+        'without_backup': meta['without_backup'],
+        'stages': meta['stages'],
+        'report_path': meta.get('report_path'),
+        'report_date': day,
+        'data_as_of': datetime.fromisoformat(meta['data_as_of']) if meta.get('data_as_of') else None,
+    }
+
+
+def day_table(index):
+    # One row per saved day, straight from the index
+    rows = [{
+        'Date': day,
+        'Total': meta['total'],
+        'Present': meta['present_count'],
+        'Absent': meta['absent_count'],
+        'Present %': round(meta['present_count'] / meta['total'] * 100, 1) if meta['total'] else 0,
+        'With backup': meta['with_backup'],
+        'Uncovered': meta['uncovered'],
+    } for day, meta in index['days'].items()]
+    return pd.DataFrame(rows, columns=['Date', 'Total', 'Present', 'Absent', 'Present %', 'With backup',
+                                       'Uncovered'])
+
+
+if __name__ == "__main__":
+    from pipeline import ROSTER_EXCEL, discover_reports, run
+
+    parser = argparse.ArgumentParser(description="List or backfill the daily dashboard snapshots")
+    parser.add_argument("--backfill", metavar="FOLDER", default=None,
+                        help="save a snapshot for every absentReport in FOLDER (against the roster workbook)")
+    parser.add_argument("--roster", default=ROSTER_EXCEL)
+    parser.add_argument("--root", default=DAILY_DIR)
+    args = parser.parse_args()
+
+    if args.backfill:
+        for report in discover_reports(args.backfill):
+            print(f"Saved {save_day(run(args.roster, report), root=args.root)}")
+    index = read_index(args.root)
+    if not index['days']:
+        print(f"No daily snapshots in '{args.root}'")
+    else:
+        print(day_table(index).to_string(index=False))
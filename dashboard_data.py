@@ -0,0 +1,202 @@
+import gzip
+import json
+import os
+import urllib.error
+import urllib.request
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+import pipeline
+from attendance_history import report_date
+from pipeline import STAGES, aggregate
+from roster import canonical_ids, canonicalize, load_roster
+from skill_index import SkillIndex
+from stage_summary import has_backup
+
+# Everything the dashboard shows is derived here, so it can be cached as one unit
+
+
+def file_signature(path):
+    # (mtime, size) changes whenever a generator script rewrites the file
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def newest_source(partition_index=None, snapshot_meta=None, roster_excel=None, report_path=None):
+    # Partitions (partitions.py) and snapshots (watcher.py) are only as new as
+    # the run that built them. The source with the newest report day, then the
+    # newest input files, is shown; ties go to the cheaper one (listed first).
+    candidates = []
+    if partition_index is not None:
+        candidates.append(('partitions', partition_index['report_date'], partition_index['data_as_of']))
+    if snapshot_meta is not None:
+        candidates.append(('snapshot', snapshot_meta.get('report_date'), snapshot_meta.get('data_as_of')))
+    if roster_excel is not None and report_path is not None:
+        as_of = datetime.fromtimestamp(max(os.path.getmtime(roster_excel), os.path.getmtime(report_path)))
+        candidates.append(('pipeline', report_date(report_path), as_of))
+
+    best, best_key = None, None
+    for name, day, as_of in candidates:
+        day = date.fromisoformat(day) if isinstance(day, str) else day
+        as_of = datetime.fromisoformat(as_of) if isinstance(as_of, str) else as_of
+        key = (day or date.min, as_of or datetime.min)
+        if best_key is None or key > best_key:
+            best, best_key = name, key
+    return best
+
+
+def load_dashboard_data(current_file, absent_file, stages=STAGES):
+    # From the CSVs written by Operator_details.py / generate_absent_csv.py
+    data = aggregate(load_roster(current_file), load_roster(absent_file), stages=stages)
+    # Newest input file time is what the numbers reflect; loaded_at shows cache reuse
+    data['data_as_of'] = datetime.fromtimestamp(max(os.path.getmtime(current_file), os.path.getmtime(absent_file)))
+    data['loaded_at'] = datetime.now()
+    return data
+
+
+def load_pipeline_data(roster_excel, report_path, stages=STAGES):
+    # Straight from the Excel inputs in one in-process call, no intermediate CSVs
+    return pipeline.run(roster_excel, report_path, stages)
+
+
+# Same numbers from a running api_server.py (one shared process for many
+# screens); the ETag of /api/all identifies the data version
+API_TIMEOUT = 5
+
+
+def api_get(url, etag=None, method='GET'):
+    # (status, ETag, parsed JSON or None); a 304 means etag is still current
+    request = urllib.request.Request(url, method=method, headers={'Accept-Encoding': 'gzip'})
+    if etag:
+        request.add_header('If-None-Match', etag)
+    try:
+        with urllib.request.urlopen(request, timeout=API_TIMEOUT) as response:
+            body = response.read()
+            if response.headers.get('Content-Encoding') == 'gzip':
+                body = gzip.decompress(body)
+            return response.status, response.headers.get('ETag'), json.loads(body) if body else None
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return 304, etag, None
+        raise
+
+
+def api_version(base_url):
+    return api_get(f"{base_url.rstrip('/')}/api/all", method='HEAD')[1]
+
+
+def _api_roster(records, columns=None):
+    # JSON records -> the same typed frame load_roster() gives for the CSVs
+    # (an empty list carries no column names, so they are passed in)
+    return canonicalize(pd.DataFrame.from_records(records, columns=columns).astype('string'))
+
+
+def load_api_data(base_url):
+    base_url = base_url.rstrip('/')
+    # One body, so the roster and the numbers are always from the same version
+    _, etag, everything = api_get(f"{base_url}/api/all")
+    summary = everything['summary']
+    current_df = _api_roster(everything['roster'])
+    plan = pd.DataFrame.from_records(everything['coverage'])
+    if 'Backup ID' in plan.columns:
+        plan['Backup ID'] = canonical_ids(plan['Backup ID'])
+    return {
+        'current_df': current_df,
+        'absent_df': _api_roster(everything['absent'], None if everything['absent'] else current_df.columns),
+        'stage_df': pd.DataFrame.from_records(everything['stages']),
+        'coverage': {'covered': summary['covered'], 'uncovered': summary['uncovered'], 'plan': plan},
+        'skill_index': SkillIndex.from_roster(current_df),
+        'absent_ids': set(canonical_ids(everything['absent_ids']).dropna().tolist()),
+        'total': summary['total'],
+        'absent_count': summary['absent'],
+        'present_count': summary['present'],
+        'stages': summary['stages'],
+        'report_date': date.fromisoformat(summary['report_date']) if summary.get('report_date') else None,
+        'data_as_of': datetime.fromisoformat(summary['data_as_of']) if summary.get('data_as_of') else None,
+        'loaded_at': datetime.now(),
+        'etag': etag,
+    }
+
+
+# Absent Operators table: main operator plus the first three backups
+ABSENT_DISPLAY_COLUMNS = {
+    "Area": "Area",
+    "Station": "Station",
+    "Name": "Name",
+    "ID": "ID",
+    "Multi_OP1_Name": "B1",
+    "Multi_OP1_ID": "B1 ID",
+    "Multi_OP2_Name": "B2",
+    "Multi_OP2_ID": "B2 ID",
+    "Multi_OP3_Name": "B3",
+    "Multi_OP3_ID": "B3 ID",
+}
+
+
+ABSENT_PAGE_SIZE = 15
+WITH_BACKUP = 'With backup'
+NO_BACKUP = 'No backup'
+ABSENT_SORT_COLUMNS = ['Area', 'Station', 'Name', 'ID', 'Backup']
+
+_ABSENT_TABLE_STYLES = [
+    {'selector': 'th', 'props': 'font-size: 0.65rem !important; padding: 3px 4px !important; text-align: center !important;'},
+    {'selector': 'td', 'props': 'font-size: 0.65rem !important; padding: 2px 4px !important; text-align: center !important;'},
+    {'selector': 'td:nth-child(3), td:nth-child(5), td:nth-child(7), td:nth-child(9)', 'props': 'text-align: left !important;'}  # Name + B1/B2/B3 names left-aligned
+]
+_NO_BACKUP_CSS = 'background-color: #FFEBEE; color: #C62828;'
+
+
+def absent_rows(absent_df):
+    # Display rows: main operator, first three backups and a Backup column
+    rows = absent_df[list(ABSENT_DISPLAY_COLUMNS)].rename(columns=ABSENT_DISPLAY_COLUMNS)
+    # Clean display: empty cells appear blank (IDs are already canonical Int64)
+    rows = rows.astype('string').fillna('')
+    rows['Backup'] = np.where(has_backup(absent_df).to_numpy(), WITH_BACKUP, NO_BACKUP)
+    return rows.reset_index(drop=True)
+
+
+def absent_table(absent_df):
+    # Display rows and their per-cell CSS, built once per data version; pages
+    # are sliced out of these instead of styling the whole table on every rerun
+    rows = absent_rows(absent_df)
+    css = pd.DataFrame('', index=rows.index, columns=rows.columns)
+    css.loc[rows['Backup'] == NO_BACKUP, :] = _NO_BACKUP_CSS
+    return rows, css
+
+
+def _absent_mask(rows, area=None, station=None, backup=None):
+    mask = np.ones(len(rows), dtype=bool)
+    if area:
+        mask &= (rows['Area'] == area).to_numpy()
+    if station:
+        mask &= (rows['Station'] == station).to_numpy()
+    if backup:
+        mask &= (rows['Backup'] == backup).to_numpy()
+    return mask
+
+
+def absent_page_count(rows, area=None, station=None, backup=None, page_size=ABSENT_PAGE_SIZE):
+    # Pages of the filtered table, known before the page widget is drawn
+    return max(1, -(-int(_absent_mask(rows, area, station, backup).sum()) // page_size))
+
+
+def absent_page(rows, css, area=None, station=None, backup=None, sort_by=None, ascending=True,
+                page=1, page_size=ABSENT_PAGE_SIZE):
+    # Filter + sort + slice on the server; only the returned page is styled.
+    # Returns (styled page, matching rows, page count, page actually shown)
+    view = rows[_absent_mask(rows, area, station, backup)]
+    if sort_by:
+        # IDs sort numerically, everything else as text
+        key = (lambda col: pd.to_numeric(col, errors='coerce')) if sort_by == 'ID' else None
+        view = view.sort_values(sort_by, ascending=ascending, kind='stable', key=key)
+
+    n_rows = len(view)
+    n_pages = max(1, -(-n_rows // page_size))
+    page = min(max(1, page), n_pages)
+    page_rows = view.iloc[(page - 1) * page_size:page * page_size]
+    styled = page_rows.style \
+        .apply(lambda _: css.loc[page_rows.index], axis=None) \
+        .set_table_styles(_ABSENT_TABLE_STYLES)
+    return styled, n_rows, n_pages, page
@@ -0,0 +1,173 @@
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+# Lightweight span instrumentation for the refresh pipeline. Each step records
+# wall time, rows in/out and memory, and is written as one JSON line:
+#   {"ts": ..., "run_id": "3f2a...", "run": "pipeline.run", "span": "excel_read",
+#    "wall_ms": 412.3, "rows_in": null, "rows_out": 573, "rss_mb": 151.2, "peak_rss_mb": 163.0}
+# Spans inside the same run_trace() share a run_id, so a slow refresh can be
+# broken down step by step (see the "Pipeline diagnostics" panel).
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+DIAGNOSTICS_LOG = os.path.join("diagnostics", "pipeline_spans.jsonl")
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 2
+
+_current_run = contextvars.ContextVar("current_run", default=None)
+_logger = logging.getLogger("diagnostics.spans")
+_logger.propagate = False
+
+
+def _ensure_handler():
+    if _logger.handlers:
+        return
+    os.makedirs(os.path.dirname(DIAGNOSTICS_LOG), exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(DIAGNOSTICS_LOG, maxBytes=LOG_MAX_BYTES,
+                                                   backupCount=LOG_BACKUPS, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _logger.addHandler(handler)
+    _logger.setLevel(logging.INFO)
+
+
+def memory_mb():
+    # (current RSS, peak RSS) of this process in MiB; None where unavailable
+    rss = peak = None
+    if psutil is not None:
+        rss = psutil.Process().memory_info().rss / 2**20
+    elif os.path.exists("/proc/self/statm"):
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    if resource is not None:
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        peak = maxrss / 2**20 if sys.platform == "darwin" else maxrss / 2**10
+        if rss is not None:
+            peak = max(peak, rss)  # ru_maxrss can lag the current sample slightly
+    return rss, peak
+
+
+def _rows(value):
+    if value is None or isinstance(value, int):
+        return value
+    return len(value)
+
+
+@contextmanager
+def run_trace(name):
+    # Groups the spans of one refresh; nested calls join the outer run
+    if _current_run.get() is not None:
+        yield _current_run.get()
+        return
+    run = {'run_id': uuid.uuid4().hex[:12], 'run': name}
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+
+@contextmanager
+def span(name, rows_in=None):
+    # with span('excel_read') as s: df = ...; s['rows_out'] = df
+    # rows_in / rows_out may be a count or anything with len()
+    record = {'rows_in': rows_in, 'rows_out': None}
+    run = _current_run.get() or {'run_id': uuid.uuid4().hex[:12], 'run': name}
+    start = time.perf_counter()
+    error = None
+    try:
+        yield record
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        wall_ms = (time.perf_counter() - start) * 1000
+        rss, peak = memory_mb()
+        entry = {
+            'ts': datetime.now().isoformat(timespec='milliseconds'),
+            'run_id': run['run_id'],
+            'run': run['run'],
+            'span': name,
+            'wall_ms': round(wall_ms, 2),
+            'rows_in': _rows(record['rows_in']),
+            'rows_out': _rows(record['rows_out']),
+            'rss_mb': round(rss, 1) if rss is not None else None,
+            'peak_rss_mb': round(peak, 1) if peak is not None else None,
+        }
+        if error:
+            entry['error'] = error
+        try:
+            _ensure_handler()
+            _logger.info(json.dumps(entry))
+        except OSError:
+            pass  # diagnostics must never break a refresh
+
+
+SPAN_COLUMNS = ['ts', 'run_id', 'run', 'span', 'wall_ms', 'rows_in', 'rows_out', 'rss_mb', 'peak_rss_mb']
+
+
+def read_spans(log_path=None, last_runs=None):
+    # Span log -> DataFrame, oldest first; optionally only the last N runs
+    log_path = log_path or DIAGNOSTICS_LOG
+    entries = []
+    for path in [f"{log_path}.{i}" for i in range(LOG_BACKUPS, 0, -1)] + [log_path]:
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue  # partially written line
+    df = pd.DataFrame(entries)
+    for col in SPAN_COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+    df = df[SPAN_COLUMNS + [c for c in df.columns if c not in SPAN_COLUMNS]]
+    df['ts'] = pd.to_datetime(df['ts'])
+    df['rows_in'] = df['rows_in'].astype('Int64')
+    df['rows_out'] = df['rows_out'].astype('Int64')
+    if last_runs is not None and len(df):
+        keep = df['run_id'].drop_duplicates().iloc[-last_runs:]
+        df = df[df['run_id'].isin(keep)]
+    return df.reset_index(drop=True)
+
+
+def run_totals(spans):
+    # One row per run: start time, total span time and the highest peak RSS
+    if len(spans) == 0:
+        return pd.DataFrame(columns=['run_id', 'run', 'started', 'wall_ms', 'peak_rss_mb', 'spans'])
+    totals = spans.groupby('run_id', sort=False).agg(
+        run=('run', 'first'), started=('ts', 'min'), wall_ms=('wall_ms', 'sum'),
+        peak_rss_mb=('peak_rss_mb', 'max'), spans=('span', 'count')).reset_index()
+    return totals.sort_values('started').reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    # python diagnostics.py  - recent runs, then the spans of the most recent one
+    spans = read_spans(last_runs=10)
+    if len(spans) == 0:
+        print(f"No spans in '{DIAGNOSTICS_LOG}' yet")
+    else:
+        print(run_totals(spans).to_string(index=False))
+        last = spans[spans['run_id'] == spans['run_id'].iloc[-1]]
+        print(f"\n{last['run'].iloc[0]} ({last['run_id'].iloc[0]}) at {last['ts'].iloc[0]:%Y-%m-%d %H:%M:%S}")
+        print(last.drop(columns=['ts', 'run_id', 'run']).to_string(index=False))
@@ -0,0 +1,157 @@
+import datetime
+import hashlib
+import json
+import os
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Parsed Excel sheets are stored here as Parquet, one file per (content, options)
+CACHE_DIR = ".excel_cache"
+
+# Oldest entries are evicted once the cache grows past this size
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+_META_KEY = b"excel_cache"
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _options_hash(*options):
+    options = json.dumps([repr(o) for o in options])
+    return hashlib.sha256(options.encode("utf-8")).hexdigest()[:12]
+
+
+def _target(path, options, cache_dir, content_hash):
+    content_hash = content_hash or file_hash(path)
+    return os.path.join(cache_dir, f"{content_hash[:24]}-{_options_hash(*options)}.parquet")
+
+
+# Excel headers can be numbers or dates (and column positions are ints), so
+# the original labels are kept in the file metadata and columns are stored by position.
+def _encode_label(label):
+    if isinstance(label, (datetime.datetime, pd.Timestamp)):
+        return ["datetime", label.isoformat()]
+    if isinstance(label, bool):
+        return ["str", str(label)]
+    if isinstance(label, int):
+        return ["int", label]
+    if isinstance(label, float):
+        return ["float", label]
+    return ["str", str(label)]
+
+
+def _decode_label(encoded):
+    kind, value = encoded
+    if kind == "datetime":
+        return datetime.datetime.fromisoformat(value)
+    return value
+
+
+def _to_arrow(df):
+    columns = {}
+    for i, col in enumerate(df.columns):
+        series = df.iloc[:, i]
+        try:
+            columns[f"c{i}"] = pa.array(series, from_pandas=True)
+        except (pa.ArrowTypeError, pa.ArrowInvalid):
+            # Mixed-type columns (dates typed as text, formulas) are stored as text
+            text = series.astype(object).where(series.isna(), series.map(str))
+            columns[f"c{i}"] = pa.array(text, type=pa.string(), from_pandas=True)
+    table = pa.table(columns) if columns else pa.table({})
+    return table
+
+
+def _write(df, target, source):
+    table = _to_arrow(df)
+    meta = {
+        "source": os.path.basename(source),
+        "columns": [_encode_label(c) for c in df.columns],
+    }
+    table = table.replace_schema_metadata({_META_KEY: json.dumps(meta).encode("utf-8")})
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    pq.write_table(table, tmp)
+    os.replace(tmp, target)
+
+
+def _read(target):
+    table = pq.read_table(target)
+    meta = json.loads(table.schema.metadata[_META_KEY])
+    df = table.to_pandas()
+    df.columns = [_decode_label(c) for c in meta["columns"]]
+    return df
+
+
+def cached_frame(path, options, build, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, content_hash=None):
+    # Any build(path) -> DataFrame, rebuilt only when the workbook content or
+    # the options (anything that changes the result) have not been seen before
+    target = _target(path, options, cache_dir, content_hash)
+    if os.path.exists(target):
+        try:
+            df = _read(target)
+            os.utime(target)  # mark as recently used for eviction
+            return df
+        except Exception:
+            # Corrupt or foreign file - fall through and rebuild it
+            os.remove(target)
+
+    df = build(path)
+    _write(df, target, path)
+    evict(cache_dir, max_bytes)
+    return df
+
+
+def _entries(cache_dir):
+    if not os.path.isdir(cache_dir):
+        return []
+    return [os.path.join(cache_dir, f) for f in os.listdir(cache_dir) if f.endswith(".parquet")]
+
+
+def invalidate(path=None, cache_dir=CACHE_DIR):
+    # Remove cached frames for one workbook (any version of it), or everything
+    removed = 0
+    for entry in _entries(cache_dir):
+        if path is not None:
+            try:
+                meta = json.loads(pq.read_schema(entry).metadata[_META_KEY])
+            except Exception:
+                meta = {}
+            if meta.get("source") != os.path.basename(path):
+                continue
+        os.remove(entry)
+        removed += 1
+    return removed
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    # Least-recently-used eviction until the cache fits in max_bytes
+    entries = [(os.path.getmtime(e), os.path.getsize(e), e) for e in _entries(cache_dir)]
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, entry in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(entry)
+        total -= size
+        removed += 1
+    return removed
+
+
+if __name__ == "__main__":
+    # python excel_cache.py --clear [workbook.xlsx]
+    if len(sys.argv) > 1 and sys.argv[1] == "--clear":
+        target = sys.argv[2] if len(sys.argv) > 2 else None
+        print(f"Removed {invalidate(target)} cached sheet(s)")
+    else:
+        entries = _entries(CACHE_DIR)
+        total = sum(os.path.getsize(e) for e in entries)
+        print(f"{len(entries)} cached sheet(s), {total / 1024:.1f} KB in '{CACHE_DIR}'")
@@ -0,0 +1,174 @@
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+from daily_snapshots import DAILY_DIR, load_day, read_index, saved_days
+from dashboard_data import NO_BACKUP, absent_rows
+
+# Formatted Excel export of the daily snapshots (daily_snapshots.py) for a
+# date range, e.g. a month or a quarter:
+#   Days            KPI totals per day
+#   Stage Summary   P / W/B / N/B / Present % per day and stage, dashboard colours
+#   one sheet per day (--by day) or per Area (--by area) with the absent operators
+# The workbook is written in openpyxl's write-only mode: rows are streamed to
+# disk as they are appended and only one day's snapshot is in memory at a time.
+
+DAY_COLUMNS = ['Date', 'Total', 'Present', 'Absent', 'Present %', 'With backup', 'Without backup',
+               'Covered', 'Uncovered']
+STAGE_COLUMNS = ['Date', 'Stage', 'P', 'W/B', 'N/B', 'Present %']
+
+_HEADER_FONT = Font(bold=True, color='FFFFFF')
+_HEADER_FILL = PatternFill('solid', fgColor='1A237E')
+_CENTER = Alignment(horizontal='center')
+
+# Same rules as the dashboard's Attendance by Stage table, in priority order
+_GREEN = (PatternFill('solid', bgColor='E8F5E9'), Font(bold=True, color='2E7D32'))
+_RED = (PatternFill('solid', bgColor='FFEBEE'), Font(bold=True, color='C62828'))
+_ORANGE = (PatternFill('solid', bgColor='FFF3E0'), Font(bold=True, color='EF6C00'))
+
+
+class _Sheet:
+    # A write-only worksheet plus the bookkeeping openpyxl does not keep for it
+
+    def __init__(self, workbook, title, columns, widths=None):
+        self.ws = workbook.create_sheet(title[:31])
+        self.columns = list(columns)
+        self.rows = 1
+        # Column widths must be set before the first row of a write-only sheet
+        for i, column in enumerate(self.columns):
+            self.ws.column_dimensions[get_column_letter(i + 1)].width = (widths or {}).get(column, max(10, len(column) + 2))
+        self.ws.freeze_panes = 'A2'
+        header = []
+        for column in self.columns:
+            cell = WriteOnlyCell(self.ws, column)
+            cell.font, cell.fill, cell.alignment = _HEADER_FONT, _HEADER_FILL, _CENTER
+            header.append(cell)
+        self.ws.append(header)
+
+    def append(self, values):
+        self.ws.append([None if pd.isna(v) else v for v in values])
+        self.rows += 1
+
+    def data_range(self):
+        return f"A2:{get_column_letter(len(self.columns))}{self.rows}"
+
+    def finish(self, rules=()):
+        # Conditional formats and the filter are written after the rows
+        self.ws.auto_filter.ref = f"A1:{get_column_letter(len(self.columns))}{self.rows}"
+        if self.rows < 2:
+            return
+        for formula, fill, font in rules:
+            self.ws.conditional_formatting.add(self.data_range(), FormulaRule(
+                formula=[formula], fill=fill, font=font, stopIfTrue=True))
+
+
+def _stage_rules(columns):
+    # Whole-row colours: 100% green, any N/B red, any W/B orange, else green
+    cols = {c: get_column_letter(i + 1) for i, c in enumerate(columns)}
+    return [
+        (f"${cols['Present %']}2=100", *_GREEN),
+        (f"${cols['N/B']}2>0", *_RED),
+        (f"${cols['W/B']}2>0", *_ORANGE),
+        ("TRUE", *_GREEN),
+    ]
+
+
+def _absent_rules(columns):
+    # Absent operators without any backup are tinted red, as on the dashboard
+    return [(f'${get_column_letter(columns.index("Backup") + 1)}2="{NO_BACKUP}"', _RED[0], Font(color='C62828'))]
+
+
+def export_absences(path, start=None, end=None, by='day', root=DAILY_DIR):
+    # Writes the workbook; returns (days exported, absent rows written)
+    index = read_index(root)
+    days = [d for d in saved_days(root, index) if (start is None or d >= start) and (end is None or d <= end)]
+    if not days:
+        raise FileNotFoundError(f"No daily snapshots in '{root}' between {start or '-'} and {end or '-'}")
+
+    workbook = Workbook(write_only=True)
+    day_sheet = _Sheet(workbook, 'Days', DAY_COLUMNS)
+    stage_sheet = _Sheet(workbook, 'Stage Summary', STAGE_COLUMNS, {'Stage': 14})
+    absent_columns = None
+    absent_sheets = {}
+    widths = {'Station': 40, 'Name': 18}
+    n_rows = 0
+
+    for day in days:
+        data = load_day(day, root, index)
+        total = data['total']
+        day_sheet.append([day, total, data['present_count'], data['absent_count'],
+                         round(data['present_count'] / total * 100, 1) if total else 0,
+                         data['with_backup'], data['without_backup'],
+                         data['coverage']['covered'], data['coverage']['uncovered']])
+        for row in data['stage_df'].itertuples(index=False):
+            stage_sheet.append([day, *row])
+
+        rows = absent_rows(data['absent_df'])
+        rows.insert(0, 'Date', day)
+        if absent_columns is None:
+            absent_columns = list(rows.columns)
+        if by == 'day':
+            sheet = absent_sheets[day] = _Sheet(workbook, day.isoformat(), absent_columns, widths)
+            for values in rows.itertuples(index=False):
+                sheet.append(values)
+        else:
+            for area, group in rows.groupby('Area', sort=False):
+                sheet = absent_sheets.get(area)
+                if sheet is None:
+                    # Sheet names cannot contain []:*?/\ and are at most 31 characters
+                    title = ''.join('_' if ch in '[]:*?/\\' else ch for ch in str(area)) or '(blank)'
+                    sheet = absent_sheets[area] = _Sheet(workbook, title, absent_columns, widths)
+                for values in group.itertuples(index=False):
+                    sheet.append(values)
+        n_rows += len(rows)
+
+    day_sheet.finish()
+    stage_sheet.finish(_stage_rules(STAGE_COLUMNS))
+    for sheet in absent_sheets.values():
+        sheet.finish(_absent_rules(absent_columns))
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    workbook.save(tmp)
+    os.replace(tmp, path)
+    return days, n_rows
+
+
+def _month_range(month):
+    # "2026-01" -> first and last day of that month
+    first = date.fromisoformat(f"{month}-01")
+    return first, (pd.Timestamp(first) + pd.offsets.MonthEnd(0)).date()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export daily absences and stage summaries to formatted Excel")
+    parser.add_argument("--month", default=None, help="YYYY-MM (instead of --start/--end)")
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="first day, YYYY-MM-DD")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="last day, YYYY-MM-DD")
+    parser.add_argument("--by", choices=['day', 'area'], default='day', help="one absent sheet per day or per Area")
+    parser.add_argument("--root", default=DAILY_DIR)
+    parser.add_argument("-o", "--output", default=None, help="default: absences <start> to <end>.xlsx")
+    args = parser.parse_args()
+
+    start, end = _month_range(args.month) if args.month else (args.start, args.end)
+    output = args.output
+    started = time.perf_counter()
+    try:
+        if output is None:
+            days = saved_days(args.root)
+            first = start or (days[0] if days else None)
+            last = end or (days[-1] if days else None)
+            output = f"absences {first} to {last}.xlsx"
+        days, n_rows = export_absences(output, start, end, args.by, args.root)
+    except FileNotFoundError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"SUCCESS! '{output}': {len(days)} day(s), {n_rows} absent rows in {time.perf_counter() - started:.1f}s")
@@ -1,6 +1,12 @@
-import pandas as pd
 import os
 import sys
+from absent_reader import AbsentReportError
+from datetime import datetime
+from attendance_history import ingest_report, report_date
+from daily_snapshots import save_day
+from diagnostics import run_trace, span
+from pipeline import absent_ids_from, aggregate, match_absent, parse_absences
+from roster import load_roster
 
 # ==================== CONFIGURATION ====================
 CURRENT_CSV = "current_employees.csv"          # Your enhanced CSV with multi-skills
@@ -8,87 +14,74 @@ ABSENT_EXCEL = "absentReport 2026-01-19.xlsx"  # Absent report
 OUTPUT_CSV = "actual_absent_manpower.csv"      # Output with full details
 # =====================================================
 
-print("=== Compal Actual Absent Manpower Generator ===")
-print("Working folder:", os.getcwd())
-print()
 
-# Load current employees
-if not os.path.exists(CURRENT_CSV):
-    print(f"ERROR: '{CURRENT_CSV}' not found! Generate it first from Excel.")
-    sys.exit(1)
-
-print(f"Loading '{CURRENT_CSV}'...")
-current_df = pd.read_csv(CURRENT_CSV)
-
-# Critical fix: Clean ID by removing '.0' and convert to string
-current_df['ID'] = current_df['ID'].astype(str).str.replace('.0', '', regex=False).str.strip()
-
-# Remove invalid rows
-current_df = current_df[current_df['ID'] != '']
-current_df = current_df[current_df['ID'] != 'nan']
-
-total_operators = len(current_df)
-print(f"Loaded {total_operators} main operators")
-print("Sample cleaned main IDs:", sorted(current_df['ID'].unique())[:15])
-print()
-
-# Load absent report
-if not os.path.exists(ABSENT_EXCEL):
-    print(f"ERROR: '{ABSENT_EXCEL}' not found!")
-    sys.exit(1)
-
-print(f"Loading '{ABSENT_EXCEL}'...")
-absent_df = pd.read_excel(ABSENT_EXCEL, dtype=str)  # All as string
-print(f"Report rows: {len(absent_df)}")
-
-# Find USER ID column
-id_col = None
-for col in absent_df.columns:
-    if 'USER' in str(col).upper() and 'ID' in str(col).upper():
-        id_col = col
-        break
-if id_col is None:
-    print("ERROR: USER ID column not found!")
-    sys.exit(1)
-print(f"Using '{id_col}' for absent IDs")
-
-# Clean and filter absent
-absent_df[id_col] = absent_df[id_col].str.strip()
-absent_only = absent_df[absent_df['STATUS'] == 'A-A']
-absent_ids = set(absent_only[id_col])
-print(f"Absent in report: {len(absent_ids)}")
-print("Sample absent IDs:", sorted(list(absent_ids))[:15])
-print()
-
-# Match main IDs
-matched_count = len(set(current_df['ID']) & absent_ids)
-print(f"MATCHED: {matched_count} absent main operators!\n")
-
-if matched_count > 0:
-    print("Matched Main IDs:", sorted(set(current_df['ID']) & absent_ids))
-
-# Generate absent list with ALL columns (including multi-skills)
-absent_final = current_df[current_df['ID'].isin(absent_ids)].copy()
-absent_final.sort_values(by=['Area', 'Station', 'Name'], inplace=True)
-absent_final.reset_index(drop=True, inplace=True)
-
-# Save
-absent_final.to_csv(OUTPUT_CSV, index=False)
-print(f"\nSUCCESS! '{OUTPUT_CSV}' generated with {matched_count} rows (full details + backups)")
-print("Path:", os.path.abspath(OUTPUT_CSV))
-
-# Summary
-present_count = total_operators - matched_count
-print("\n" + "="*60)
-print("ATTENDANCE SUMMARY - December 17, 2025")
-print("="*60)
-print(f"Total Main Operators : {total_operators}")
-print(f"Absent               : {matched_count}")
-print(f"Present              : {present_count}")
-print(f"Attendance Rate      : {round(present_count / total_operators * 100, 1) if total_operators else 0}%")
-
-if matched_count > 0:
-    print("\nAbsent Operators (with multi-skill backups):")
-    print(absent_final.to_string(index=False))
-
-print("\n=== DONE! Refresh folder and check the CSV ===")
\ No newline at end of file
+def main():
+    print("=== Compal Actual Absent Manpower Generator ===")
+
+    # Load current employees
+    if not os.path.exists(CURRENT_CSV):
+        print(f"ERROR: '{CURRENT_CSV}' not found! Generate it first from Excel.")
+        sys.exit(1)
+
+    # IDs are canonicalized to Int64 by the shared roster loader
+    with span('roster_csv_load') as s:
+        current_df = load_roster(CURRENT_CSV)
+        current_df = s['rows_out'] = current_df[current_df['ID'].notna()]
+    total_operators = len(current_df)
+    print(f"Loaded {total_operators} main operators from '{CURRENT_CSV}'")
+
+    # Load absent report
+    if not os.path.exists(ABSENT_EXCEL):
+        print(f"ERROR: '{ABSENT_EXCEL}' not found!")
+        sys.exit(1)
+
+    # Stream only the USER ID and STATUS cells instead of loading the whole sheet
+    try:
+        statuses = parse_absences(ABSENT_EXCEL)
+    except AbsentReportError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    absent_ids = absent_ids_from(statuses, 'A-A')
+    print(f"Report rows: {len(statuses)}, absent in report: {len(absent_ids)}")
+
+    # Generate absent list with ALL columns (including multi-skills)
+    absent_final = match_absent(current_df, absent_ids)
+    matched_count = len(absent_final)
+
+    # Save
+    with span('absent_csv_write', rows_in=absent_final):
+        absent_final.to_csv(OUTPUT_CSV, index=False)
+    print(f"SUCCESS! '{OUTPUT_CSV}' generated with {matched_count} rows (full details + backups)")
+
+    # Keep the day in the attendance history (skipped if this date is already stored)
+    valid = statuses.dropna(subset=['operator_id'])
+    with span('history_ingest', rows_in=valid):
+        added = ingest_report(ABSENT_EXCEL, current_df, statuses=list(valid.itertuples(index=False, name=None)))
+    if added:
+        print(f"Added {report_date(ABSENT_EXCEL)} to attendance history")
+
+    # Materialized snapshot of the day for the dashboard's date picker
+    result = aggregate(current_df, absent_final, absent_ids)
+    result.update({
+        'report_path': ABSENT_EXCEL,
+        'data_as_of': datetime.fromtimestamp(max(os.path.getmtime(CURRENT_CSV), os.path.getmtime(ABSENT_EXCEL))),
+    })
+    with span('daily_snapshot', rows_in=absent_final):
+        day = save_day(result, report_date(ABSENT_EXCEL))
+    print(f"Saved daily snapshot for {day}")
+
+    # Summary
+    present_count = total_operators - matched_count
+    print("\n" + "="*60)
+    print(f"ATTENDANCE SUMMARY - {report_date(ABSENT_EXCEL):%B %d, %Y}")
+    print("="*60)
+    print(f"Total Main Operators : {total_operators}")
+    print(f"Absent               : {matched_count}")
+    print(f"Present              : {present_count}")
+    print(f"Attendance Rate      : {round(present_count / total_operators * 100, 1) if total_operators else 0}%")
+
+
+if __name__ == "__main__":
+    # Step timings and memory go to the diagnostics span log (python diagnostics.py)
+    with run_trace('generate_absent_csv'):
+        main()
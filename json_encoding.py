@@ -0,0 +1,10 @@
+from datetime import date, datetime
+
+# JSON for the files and API bodies the pipeline writes: dates and times as
+# ISO strings, read back with date/datetime.fromisoformat
+
+
+def json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
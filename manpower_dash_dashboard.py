@@ -2,6 +2,19 @@ import streamlit as st
 import pandas as pd
 import os
 import altair as alt
+from dashboard_data import (ABSENT_PAGE_SIZE, ABSENT_SORT_COLUMNS, NO_BACKUP, STAGES, WITH_BACKUP, absent_page,
+                            absent_page_count, absent_rows, absent_table, api_version, file_signature, load_api_data,
+                            load_dashboard_data, load_pipeline_data, newest_source)
+from pipeline import ROSTER_EXCEL, latest_report
+from stage_summary import has_backup
+from attendance_history import ingested_dates, monthly_attendance
+from diagnostics import DIAGNOSTICS_LOG, read_spans, span
+from risk import N_SCENARIOS, absence_rates, simulate
+from snapshot import SNAPSHOT_DIR, current_version, load_snapshot, read_meta
+from partitions import INDEX_FILE, PARTITION_DIR, load_partition, plant_rollup, read_index
+from roster_versions import VERSION_DIR, INDEX_FILE as VERSION_INDEX_FILE, load_changes, monthly_attrition
+from roster_versions import read_index as read_version_index
+from daily_snapshots import DAILY_DIR, INDEX_FILE as DAILY_INDEX_FILE, day_table, load_day, read_index as read_daily_index, saved_days
 
 st.set_page_config(page_title="OP Management", page_icon="👷", layout="wide")
 
@@ -125,83 +138,247 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Files
+# Files: with OP_API_URL set, everything comes from a running api_server.py.
+# Otherwise the newest of the line/shift partitions built by partitions.py, a
+# snapshot published by watcher.py and the Excel inputs (one in-process
+# pipeline run) is shown, then the generator CSVs
+api_url = os.environ.get("OP_API_URL")
+roster_excel = ROSTER_EXCEL
+report_file = latest_report(".")
 current_file = "current_employees.csv"
 absent_file = "actual_absent_manpower.csv"
 
-if not os.path.exists(current_file) or not os.path.exists(absent_file):
-    st.error("Missing CSV files! Run generator scripts first.")
+partition_index = read_index(PARTITION_DIR) if api_url is None else None
+published_version = current_version(SNAPSHOT_DIR) if api_url is None else None
+use_pipeline = os.path.exists(roster_excel) and report_file is not None
+source = newest_source(partition_index, read_meta(published_version, SNAPSHOT_DIR) if published_version else None,
+                       roster_excel if use_pipeline else None, report_file if use_pipeline else None)
+partition_index = partition_index if source == 'partitions' else None
+snapshot_version = published_version if source == 'snapshot' else None
+use_pipeline = source == 'pipeline'
+if api_url is None and partition_index is None and snapshot_version is None and not use_pipeline and (not os.path.exists(current_file) or not os.path.exists(absent_file)):
+    st.error("Missing input files! Add the roster workbook and an absentReport, or run the generator scripts first.")
     st.stop()
 
-# Read ID columns as strings to prevent float issues
-id_columns = ['ID', 'Multi_OP1_ID', 'Multi_OP2_ID', 'Multi_OP3_ID']
-dtype_dict = {col: str for col in id_columns}
+# Parsing, ID cleanup and stage aggregation run once per file change and are
+# shared across all sessions; paths plus (mtime, size) signatures form the cache key.
+@st.cache_data(show_spinner=False)
+def get_pipeline_data(roster_path, roster_signature, report_path, report_signature):
+    return load_pipeline_data(roster_path, report_path)
 
-current_df = pd.read_csv(current_file, dtype=dtype_dict)
-absent_df = pd.read_csv(absent_file, dtype=dtype_dict)
+@st.cache_data(show_spinner=False)
+def get_dashboard_data(current_signature, absent_signature):
+    return load_dashboard_data(current_file, absent_file)
 
-# Clean IDs: remove any trailing .0, .00, etc. and 'nan'
-for col in id_columns:
-    if col in current_df.columns:
-        current_df[col] = current_df[col].str.strip().str.replace(r'\.0+$', '', regex=True).replace({'nan': '', 'NaN': ''})
-    if col in absent_df.columns:
-        absent_df[col] = absent_df[col].str.strip().str.replace(r'\.0+$', '', regex=True).replace({'nan': '', 'NaN': ''})
+# Snapshots are immutable, so the version string alone is the cache key.
+# cache_resource hands every session the same memory-mapped frames instead of
+# an unpickled private copy per rerun
+@st.cache_resource(show_spinner=False, max_entries=2)
+def get_snapshot_data(version):
+    return load_snapshot(SNAPSHOT_DIR, version)
 
-current_df = current_df[current_df['Area'].isin(['CG', 'Offline', 'Assy', 'Testing', 'Packout'])]
-absent_df = absent_df[absent_df['Area'].isin(['CG', 'Offline', 'Assy', 'Testing', 'Packout'])]
+# One download per API data version (ETag), shared by all sessions
+@st.cache_data(show_spinner=False, max_entries=2)
+def get_api_data(url, etag):
+    return load_api_data(url)
 
-total = len(current_df[current_df['ID'] != ''])
-absent_count = len(absent_df)
-present_count = total - absent_count
+# Each line/shift is loaded only when selected and cached on its own; a
+# rebuilt index (new signature) invalidates them all
+@st.cache_data(show_spinner=False, max_entries=16)
+def get_partition_data(line, shift, index_signature):
+    return load_partition(line, shift, PARTITION_DIR)
+
+# Display rows + CSS for the absent table, once per data version (not per rerun)
+@st.cache_data(show_spinner=False, max_entries=8)
+def get_absent_table(version, _absent_df):
+    return absent_table(_absent_df)
+
+PLANT_VIEW = "Plant (all lines)"
+selected_partition = None
+if partition_index is not None:
+    partition_keys = [(p['line'], p['shift']) for p in partition_index['partitions']]
+    selected_partition = st.sidebar.selectbox(
+        "Line / Shift", [PLANT_VIEW] + partition_keys, index=1 if partition_keys else 0,
+        format_func=lambda key: key if key == PLANT_VIEW else f"{key[0]} • {key[1]}")
+
+# Past days come from the materialized daily snapshots (daily_snapshots.py);
+# leaving the date empty shows the live data
+@st.cache_data(show_spinner=False, max_entries=32)
+def get_day_data(day, index_signature):
+    return load_day(day, DAILY_DIR)
+
+daily_index = read_daily_index(DAILY_DIR)
+history_day = None
+if daily_index['days']:
+    days = saved_days(index=daily_index)
+    history_day = st.sidebar.date_input("Saved day", value=None, min_value=days[0], max_value=days[-1],
+                                        help="Pick a processed day to view its snapshot; leave empty for live data")
+
+# Reduced layout of the saved-day and plant views: title, date line and the
+# four KPI cards
+def render_kpis(day, scope, data_as_of, total, present_count, absent_count, uncovered):
+    st.markdown("<h1>👷 OP Dashboard</h1>", unsafe_allow_html=True)
+    st.markdown(f"<div class='date-header'>📅 {day:%B %d, %Y} | {scope}</div>", unsafe_allow_html=True)
+    if data_as_of is not None:
+        st.markdown(f"<div style='text-align:center;font-size:0.65rem;color:#888;'>Data as of {data_as_of:%d %b %Y %H:%M:%S}</div>", unsafe_allow_html=True)
+    kpi_cols = st.columns(4, gap="small")
+    present_pct = round(present_count / total * 100, 1) if total else 0
+    for col, label, value, color in [
+        (kpi_cols[0], 'TOTAL', total, '#1E88E5'),
+        (kpi_cols[1], 'PRESENT', f"{present_count} ({present_pct}%)", '#43A047'),
+        (kpi_cols[2], 'ABSENT', absent_count, '#E53935'),
+        (kpi_cols[3], 'UNCOVERED', uncovered, '#C62828'),
+    ]:
+        col.markdown(f"<div class='kpi-card'><div class='kpi-label'>{label}</div><div class='kpi-value' style='color:{color};'>{value}</div></div>", unsafe_allow_html=True)
+
+if history_day is not None:
+    if history_day not in days:
+        st.markdown("<h1>👷 OP Dashboard</h1>", unsafe_allow_html=True)
+        st.markdown(f"<div class='date-header'>📅 {history_day:%B %d, %Y}</div>", unsafe_allow_html=True)
+        st.warning(f"No snapshot saved for {history_day:%B %d, %Y}. Saved days: {', '.join(f'{d:%d %b}' for d in days)}")
+        st.dataframe(day_table(daily_index), use_container_width=True, hide_index=True)
+        st.stop()
+    day_data = get_day_data(history_day, file_signature(os.path.join(DAILY_DIR, DAILY_INDEX_FILE)))
+    render_kpis(history_day, f"Saved snapshot • {' • '.join(day_data['stages'])}", day_data['data_as_of'],
+                day_data['total'], day_data['present_count'], day_data['absent_count'],
+                day_data['coverage']['uncovered'])
+    st.markdown("### 📊 Attendance by Stage")
+    st.dataframe(day_data['stage_df'], use_container_width=True, hide_index=True)
+    st.markdown(f"### 🚨 Absent Operators ({day_data['absent_count']})")
+    st.markdown(f"""<div style='font-size:0.7rem;'>
+        <b>Backup Summary:</b>
+        <span style='color:#2E7D32;'>{day_data['with_backup']} with backup</span> •
+        <span style='color:#C62828;'>{day_data['without_backup']} without backup</span> |
+        <b>Effective Coverage:</b>
+        <span style='color:#2E7D32;'>{day_data['coverage']['covered']} covered</span> •
+        <span style='color:#C62828;'>{day_data['coverage']['uncovered']} uncovered</span>
+    </div>""", unsafe_allow_html=True)
+    rows = absent_rows(day_data['absent_df'])
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+    with st.expander("Deployment plan"):
+        st.dataframe(day_data['coverage']['plan'], use_container_width=True, hide_index=True)
+    st.stop()
+
+if selected_partition == PLANT_VIEW:
+    # Plant-wide rollup from the per-partition summaries; no roster rows are loaded
+    rollup = plant_rollup(partition_index)
+    render_kpis(rollup['report_date'], f"Plant • {len(rollup['by_partition'])} line/shift partitions",
+                rollup['data_as_of'], rollup['total'], rollup['present_count'], rollup['absent_count'],
+                rollup['uncovered'])
+    st.markdown("### 🏭 Lines & Shifts")
+    st.dataframe(rollup['by_partition'], use_container_width=True, hide_index=True)
+    st.markdown("### 📊 Attendance by Stage")
+    st.dataframe(rollup['stage_df'], use_container_width=True, hide_index=True)
+    if len(rollup['unrostered']) > 0:
+        st.markdown("<div style='font-size:0.7rem;color:#666;'>Absent on lines/shifts without a roster workbook:</div>", unsafe_allow_html=True)
+        st.dataframe(rollup['unrostered'].rename(columns={'line': 'Line', 'shift': 'Shift', 'absent_count': 'Absent'}),
+                     use_container_width=True, hide_index=True)
+    st.stop()
+
+# data_version identifies the loaded data; anything derived from it is cached on it
+if api_url is not None:
+    try:
+        data_version = ('api', api_url, api_version(api_url))
+        data = get_api_data(*data_version[1:])
+    except OSError as e:
+        st.error(f"Cannot reach the OP API at {api_url}: {e}")
+        st.stop()
+elif selected_partition is not None:
+    data_version = ('partition', *selected_partition, file_signature(os.path.join(PARTITION_DIR, INDEX_FILE)))
+    data = get_partition_data(*data_version[1:])
+elif snapshot_version is not None:
+    data_version = ('snapshot', snapshot_version)
+    data = get_snapshot_data(snapshot_version)
+elif use_pipeline:
+    data_version = ('pipeline', roster_excel, file_signature(roster_excel), report_file, file_signature(report_file))
+    data = get_pipeline_data(*data_version[1:])
+else:
+    data_version = ('csv', file_signature(current_file), file_signature(absent_file))
+    data = get_dashboard_data(*data_version[1:])
+current_df = data['current_df']
+absent_df = data['absent_df']
+stage_df = data['stage_df']
+
+total = data['total']
+absent_count = data['absent_count']
+present_count = data['present_count']
 
 MALE_COUNT = 20
 FEMALE_COUNT = 119
 
-stages = ['CG', 'Offline', 'Assy', 'Testing', 'Packout']
-stage_data = []
- 
-for stage in stages:
-    total_in_stage = len(current_df[(current_df['Area'] == stage) & (current_df['ID'] != '')])
-    absent_in_stage_df = absent_df[absent_df['Area'] == stage]
-    absent_in_stage = len(absent_in_stage_df)
-    present_in_stage = total_in_stage - absent_in_stage
-
-    absent_with_backup = 0
-    absent_without_backup = 0
-    for _, row in absent_in_stage_df.iterrows():
-        has_backup = any(pd.notna(row[col]) and str(row[col]).strip() != '' 
-                        for col in ['Multi_OP1_Name', 'Multi_OP2_Name', 'Multi_OP3_Name'])
-        if has_backup:
-            absent_with_backup += 1
-        else:
-            absent_without_backup += 1
-
-    present_pct = round((present_in_stage / total_in_stage) * 100) if total_in_stage > 0 else 0
- 
-    stage_data.append({
-        'Stage': stage,
-        'P': present_in_stage,
-        'W/B': absent_with_backup,
-        'N/B': absent_without_backup,
-        'Present %': present_pct
-    })
+stages = data.get('stages', STAGES)
 
-stage_df = pd.DataFrame(stage_data)
+# Attrition from the stored roster versions (joiners/leavers per month);
+# re-read only when a new version has been saved
+@st.cache_data(show_spinner=False)
+def get_roster_versions(index_signature):
+    return read_version_index(VERSION_DIR)
 
-# Attrition
-attrition_data = [
-    {'Month': 'Oct', 'Total Required MP': 215, 'Present MP': 227, 'Attrition': 9, 'Attrition %': 4.0},
-    {'Month': 'Nov', 'Total Required MP': 215, 'Present MP': 214, 'Attrition': 12, 'Attrition %': 6.0},
-    {'Month': 'Dec', 'Total Required MP': 215, 'Present MP': 200, 'Attrition': 14, 'Attrition %': 7.0},
-    {'Month': 'Jan', 'Total Required MP': 215, 'Present MP': 202, 'Attrition': 7, 'Attrition %': 3.0}
-]
-attrition_df = pd.DataFrame(attrition_data)
+version_index_path = os.path.join(VERSION_DIR, VERSION_INDEX_FILE)
+roster_versions = get_roster_versions(file_signature(version_index_path) if os.path.exists(version_index_path) else None)
+attrition_df = monthly_attrition(index=roster_versions)
+
+# Monthly trend from the attendance history written by generate_absent_csv.py;
+# re-queried only when a new day has been ingested
+@st.cache_data(show_spinner=False)
+def get_monthly_attendance(history_dates):
+    return monthly_attendance()
+
+monthly_df = get_monthly_attendance(tuple(ingested_dates()))
+if len(attrition_df) > 0:
+    trend_title = "### 📈 Attrition Trend"
+    trend_df = pd.DataFrame({
+        'Month': attrition_df['Month'],
+        'Present MP': attrition_df['Headcount'],
+        'Rate': attrition_df['Attrition %'],
+    })
+    rate_label, count_label = 'Attr%', 'HC'
+elif len(monthly_df) > 0:
+    trend_title = "### 📈 Attendance Trend"
+    trend_df = pd.DataFrame({
+        'Month': monthly_df['Month'],
+        'Present MP': monthly_df['Present MP'],
+        'Rate': (100 - monthly_df['Attendance %']).round(1),
+    })
+    rate_label, count_label = 'Abs%', 'Pres'
+else:
+    trend_title = "### 📈 Attrition Trend"
+    trend_df = pd.DataFrame(columns=['Month', 'Present MP', 'Rate'])
+    rate_label, count_label = 'Attr%', 'HC'
 
 # Header
 st.markdown("<h1>👷 OP Dashboard</h1>", unsafe_allow_html=True)
-st.markdown("<div class='date-header'>📅 January 19, 2026 | CG • Offline • Assy • Testing • Packout</div>", unsafe_allow_html=True)
+scope = f"{data['line']} • {data['shift']} | " if 'line' in data else ""
+# CSV inputs carry no report date; the newest input file's date stands in
+header_date = data.get('report_date') or data['data_as_of'].date()
+st.markdown(f"<div class='date-header'>📅 {header_date:%B %d, %Y} | {scope}{' • '.join(stages)}</div>", unsafe_allow_html=True)
+st.markdown(f"<div style='text-align:center;font-size:0.65rem;color:#888;'>Data as of {data['data_as_of']:%d %b %Y %H:%M:%S} • loaded {data['loaded_at']:%H:%M:%S}</div>", unsafe_allow_html=True)
+
+# Pick up newly published snapshots without a manual refresh, whichever
+# source is on screen (a new snapshot may now be the newest one)
+@st.fragment(run_every=5)
+def watch_snapshot():
+    if current_version(SNAPSHOT_DIR) != published_version:
+        st.rerun()
+
+if api_url is None:
+    watch_snapshot()
 
-left_col, right_col = st.columns([1, 3], gap="small")
+# API mode: a cheap HEAD request; only a new ETag reruns the page
+@st.fragment(run_every=5)
+def watch_api():
+    try:
+        if api_version(api_url) != data_version[2]:
+            st.rerun()
+    except OSError:
+        pass
+
+if api_url is not None:
+    watch_api()
+
+today_tab, risk_tab = st.tabs(["📋 Today", "🎲 Staffing risk"])
+
+left_col, right_col = today_tab.columns([1, 3], gap="small")
 
 with left_col:
     st.markdown("<div class='kpi-card'>", unsafe_allow_html=True)
@@ -316,24 +493,27 @@ with right_col:
     st.markdown("<div class='section-card'>", unsafe_allow_html=True)
     attr_col1, attr_col2 = st.columns([2, 1], gap="small")
     with attr_col1:
-        st.markdown("### 📈 Attrition Trend")
-        month_order = ['Oct', 'Nov', 'Dec', 'Jan']
-        line_chart = alt.Chart(attrition_df).mark_line(color='#E53935', strokeWidth=2).encode(
-            x=alt.X('Month:N', title=None, sort=month_order, axis=alt.Axis(labelFontSize=9)),
-            y=alt.Y('Attrition %:Q', title=None, axis=alt.Axis(labelFontSize=8), scale=alt.Scale(domain=[0, 7])),
-            tooltip=['Month', 'Attrition %']
-        ).properties(height=120)
-        points = alt.Chart(attrition_df).mark_circle(color='#E53935', size=40).encode(
-            x=alt.X('Month:N', sort=month_order),
-            y='Attrition %:Q'
-        )
-        st.altair_chart(line_chart + points, use_container_width=True, theme=None)
+        st.markdown(trend_title)
+        if len(trend_df) == 0:
+            st.markdown("<div style='font-size:0.7rem;color:#666;'>Needs two saved roster versions (Operator_details.py) or attendance history.</div>", unsafe_allow_html=True)
+        else:
+            month_order = trend_df['Month'].tolist()
+            line_chart = alt.Chart(trend_df).mark_line(color='#E53935', strokeWidth=2).encode(
+                x=alt.X('Month:N', title=None, sort=month_order, axis=alt.Axis(labelFontSize=9)),
+                y=alt.Y('Rate:Q', title=None, axis=alt.Axis(labelFontSize=8), scale=alt.Scale(domain=[0, max(7, trend_df['Rate'].max() + 1)])),
+                tooltip=['Month', alt.Tooltip('Rate:Q', title=rate_label)]
+            ).properties(height=120)
+            points = alt.Chart(trend_df).mark_circle(color='#E53935', size=40).encode(
+                x=alt.X('Month:N', sort=month_order),
+                y='Rate:Q'
+            )
+            st.altair_chart(line_chart + points, use_container_width=True, theme=None)
    
     with attr_col2:
         st.markdown("#### Data")
-        attr_table = attrition_df[['Month', 'Present MP', 'Attrition %']].copy()
-        attr_table['Attrition %'] = attr_table['Attrition %'].apply(lambda x: f"{x:.1f}%")
-        attr_table.columns = ['Mon', 'Pres', 'Attr%']
+        attr_table = trend_df[['Month', 'Present MP', 'Rate']].copy()
+        attr_table['Rate'] = attr_table['Rate'].apply(lambda x: f"{x:.1f}%")
+        attr_table.columns = ['Mon', count_label, rate_label]
         def color_attr(val):
             if isinstance(val, str) and '%' in val:
                 pct = float(val.replace('%', ''))
@@ -341,7 +521,7 @@ with right_col:
                 elif pct <= 4: return 'background-color:#FFF9C4;color:#000;'
                 else: return 'background-color:#FFCDD2;color:#000;'
             return ''
-        styled_attr = attr_table.style.applymap(color_attr, subset=['Attr%']).set_table_styles([
+        styled_attr = attr_table.style.map(color_attr, subset=[rate_label]).set_table_styles([
             {'selector': 'th', 'props': 'font-size:0.6rem;padding:1px 2px;text-align:center;'},
             {'selector': 'td', 'props': 'font-size:0.6rem;padding:1px 2px;text-align:center;'}
         ])
@@ -352,48 +532,38 @@ with right_col:
     st.markdown("<div class='section-card'>", unsafe_allow_html=True)
     if absent_count > 0:
         st.markdown(f"### 🚨 Absent Operators ({absent_count})")
-        display_df = absent_df.copy()
-        
-        # Rename backup columns
-        display_df = display_df.rename(columns={
-            "Area": "Area",
-            "Station": "Station",
-            "Name": "Name",
-            "ID": "ID",
-            "Multi_OP1_Name": "B1",
-            "Multi_OP1_ID": "B1 ID",
-            "Multi_OP2_Name": "B2",
-            "Multi_OP2_ID": "B2 ID",
-            "Multi_OP3_Name": "B3",
-            "Multi_OP3_ID": "B3 ID"
-        })
-        
-        # Final safety: remove any trailing .0 from backup IDs
-        for col in ['B1 ID', 'B2 ID', 'B3 ID']:
-            display_df[col] = display_df[col].str.replace(r'\.0+$', '', regex=True)
-        
-        # Select and order columns exactly as requested
-        columns_order = ['Area', 'Station', 'Name', 'ID', 'B1', 'B1 ID', 'B2', 'B2 ID', 'B3', 'B3 ID']
-        display_df = display_df[columns_order]
-        
-        # Clean display: empty cells appear blank
-        display_df = display_df.fillna('')
-        
-        styled_display_df = display_df.style \
-            .set_table_styles([
-                {'selector': 'th', 'props': 'font-size: 0.65rem !important; padding: 3px 4px !important; text-align: center !important;'},
-                {'selector': 'td', 'props': 'font-size: 0.65rem !important; padding: 2px 4px !important; text-align: center !important;'},
-                {'selector': 'td:nth-child(3), td:nth-child(5), td:nth-child(7), td:nth-child(9)', 'props': 'text-align: left !important;'}  # Name + B1/B2/B3 names left-aligned
-            ])
-        
-        st.dataframe(styled_display_df, use_container_width=True, hide_index=True, height=min(400, 40 + (absent_count * 25)))
+        # Filter / sort / page on the server; only the visible page is styled and sent
+        rows, css = get_absent_table(data_version, absent_df)
+        f_area, f_station, f_backup, f_sort, f_page = st.columns([1, 1.4, 1, 1, 0.8], gap="small")
+        ALL = "All"
+        area_filter = f_area.selectbox("Area", [ALL] + sorted(rows['Area'].unique()), key="absent_area")
+        station_options = rows.loc[rows['Area'] == area_filter, 'Station'] if area_filter != ALL else rows['Station']
+        station_filter = f_station.selectbox("Station", [ALL] + sorted(station_options.unique()), key="absent_station")
+        backup_filter = f_backup.selectbox("Backup", [ALL, WITH_BACKUP, NO_BACKUP], key="absent_backup")
+        sort_by = f_sort.selectbox("Sort by", ABSENT_SORT_COLUMNS, key="absent_sort")
+        descending = f_sort.toggle("Descending", key="absent_desc")
+        filters = {
+            'area': None if area_filter == ALL else area_filter,
+            'station': None if station_filter == ALL else station_filter,
+            'backup': None if backup_filter == ALL else backup_filter,
+        }
+        # A narrower filter (or fewer absentees) shrinks the page count; the
+        # widget's stored page is clamped before it is drawn
+        n_pages = absent_page_count(rows, **filters)
+        if st.session_state.get("absent_page", 1) > n_pages:
+            st.session_state["absent_page"] = n_pages
+        page = f_page.number_input("Page", min_value=1, max_value=n_pages, step=1, key="absent_page")
+        with span('styler_render', rows_in=rows) as render:
+            styled_page, matching, n_pages, page = absent_page(
+                rows, css, **filters, sort_by=sort_by, ascending=not descending, page=page)
+            page_len = min(ABSENT_PAGE_SIZE, matching - (page - 1) * ABSENT_PAGE_SIZE)
+            st.dataframe(styled_page, use_container_width=True, hide_index=True, height=40 + max(page_len, 1) * 35)
+            render['rows_out'] = page_len
+        st.markdown(f"<div style='font-size:0.65rem;color:#666;'>{matching} of {absent_count} absent • page {page} of {n_pages}</div>", unsafe_allow_html=True)
         
         # Backup summary
-        backup_available = len(absent_df[
-            (absent_df['Multi_OP1_Name'].notna() & absent_df['Multi_OP1_Name'].str.strip() != '') |
-            (absent_df['Multi_OP2_Name'].notna() & absent_df['Multi_OP2_Name'].str.strip() != '') |
-            (absent_df['Multi_OP3_Name'].notna() & absent_df['Multi_OP3_Name'].str.strip() != '')
-        ])
+        # Any of the backup slots (B1..B7) counts
+        backup_available = int(has_backup(absent_df).sum())
         backup_not_available = absent_count - backup_available
         
         st.markdown(f"""
@@ -403,6 +573,18 @@ with right_col:
             <span style='color:#C62828;'>{backup_not_available} without backup</span>
         </div>
         """, unsafe_allow_html=True)
+
+        # Effective coverage: one present backup per station, one station per backup
+        coverage = data['coverage']
+        st.markdown(f"""
+        <div style='font-size:0.7rem; margin-top:3px;'>
+            <b>Effective Coverage:</b>
+            <span style='color:#2E7D32;'>{coverage['covered']} covered by present backups</span> •
+            <span style='color:#C62828;'>{coverage['uncovered']} uncovered</span>
+        </div>
+        """, unsafe_allow_html=True)
+        with st.expander("Deployment plan"):
+            st.dataframe(coverage['plan'], use_container_width=True, hide_index=True)
         st.markdown("""
         <div style='font-size:0.65rem; color:#666; margin-top:3px;'>
             <b>Backup Operators:</b> B1 = Primary, B2 = Secondary, B3 = Tertiary
@@ -413,4 +595,87 @@ with right_col:
         st.markdown("<div style='text-align:center;padding:0.5rem;background-color:#E8F5E9;border-radius:4px;font-size:0.8rem;'>✅ Perfect Attendance Today</div>", unsafe_allow_html=True)
     st.markdown("</div>", unsafe_allow_html=True)
 
+    # Skill lookup: operator ID -> stations, or station -> who can cover it today
+    st.markdown("<div class='section-card'>", unsafe_allow_html=True)
+    lookup = st.text_input("🔎 Skill lookup", placeholder="Operator ID or station name").strip()
+    if lookup:
+        skill_index = data['skill_index']
+        if skill_index.operator_code(lookup) is not None:
+            st.dataframe(skill_index.stations_for(lookup), use_container_width=True, hide_index=True)
+        else:
+            # The day's full absent set: backups and other stations count too
+            result = skill_index.operators_for(lookup, data['absent_ids'])
+            if len(result) > 0:
+                st.dataframe(result, use_container_width=True, hide_index=True)
+            else:
+                st.markdown("<div style='font-size:0.7rem;color:#666;'>No matching operator ID or station.</div>", unsafe_allow_html=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # What changed in the latest roster version (joiners, leavers, moves, backups)
+    if len(roster_versions['versions']) > 1:
+        latest_version = roster_versions['versions'][-1]
+        with st.expander(f"🔄 Roster changes ({latest_version['as_of'][:10]})"):
+            st.markdown(f"<div style='font-size:0.7rem;'>{latest_version['joiners']} joiners • {latest_version['leavers']} leavers • "
+                        f"{latest_version['station_moves']} station moves • {latest_version['backup_changes']} backup changes</div>", unsafe_allow_html=True)
+            st.dataframe(load_changes(latest_version['version'], VERSION_DIR), use_container_width=True, hide_index=True)
+
+    # Pipeline diagnostics: step timings from the span log written by every refresh
+    with st.expander("⏱️ Pipeline diagnostics"):
+        spans = read_spans(last_runs=200) if os.path.exists(DIAGNOSTICS_LOG) else None
+        if spans is None or len(spans) == 0:
+            st.markdown("<div style='font-size:0.7rem;color:#666;'>No timings recorded yet.</div>", unsafe_allow_html=True)
+        else:
+            latest = spans.drop_duplicates('span', keep='last').sort_values('ts')
+            latest_table = pd.DataFrame({
+                'Step': latest['span'],
+                'ms': latest['wall_ms'],
+                'Rows in': latest['rows_in'],
+                'Rows out': latest['rows_out'],
+                'RSS MB': latest['rss_mb'],
+                'Peak MB': latest['peak_rss_mb'],
+                'At': latest['ts'].dt.strftime('%d %b %H:%M:%S'),
+                'Run': latest['run'],
+            })
+            st.dataframe(latest_table, use_container_width=True, hide_index=True)
+            history_chart = alt.Chart(spans).mark_line(point=True, strokeWidth=1).encode(
+                x=alt.X('ts:T', title=None, axis=alt.Axis(labelFontSize=8)),
+                y=alt.Y('wall_ms:Q', title='ms', axis=alt.Axis(labelFontSize=8)),
+                color=alt.Color('span:N', legend=alt.Legend(title=None, labelFontSize=8)),
+                tooltip=['span', 'run', 'wall_ms', 'rows_in', 'rows_out', 'peak_rss_mb', alt.Tooltip('ts:T', format='%d %b %H:%M:%S')]
+            ).properties(height=180)
+            st.altair_chart(history_chart, use_container_width=True, theme=None)
+
+# Staffing risk: Monte Carlo over per-operator absence rates from the history;
+# re-simulated only when the roster or the history changes
+@st.cache_data(show_spinner=False, max_entries=8)
+def get_staffing_risk(version, history_dates, n_scenarios, _current_df, _stages):
+    rates, plant_rate, n_days = absence_rates()
+    return simulate(_current_df, rates, plant_rate, n_scenarios, _stages), n_days
+
+with risk_tab:
+    n_scenarios = st.select_slider("Scenarios", options=[1_000, 5_000, N_SCENARIOS, 50_000], value=N_SCENARIOS)
+    with span('risk_simulation', rows_in=current_df) as sim:
+        risk, history_days = get_staffing_risk(data_version, tuple(ingested_dates()), n_scenarios, current_df, stages)
+        sim['rows_out'] = risk['stations']
+    basis = f"{history_days} day(s) of attendance history" if history_days else "a default rate (no attendance history yet)"
+    st.markdown(f"<div style='font-size:0.7rem;color:#666;'>{risk['n_scenarios']:,} simulated days • absence rates from {basis}, plant rate {risk['plant_rate']:.1%} • "
+                f"<b>P(any station uncovered): {risk['plant_risk']}%</b></div>", unsafe_allow_html=True)
+
+    risk_chart_col, risk_table_col = st.columns([1.3, 1], gap="medium")
+    with risk_chart_col:
+        st.markdown("### 🎲 Chance of an uncovered station")
+        risk_chart = alt.Chart(risk['stages']).mark_bar(size=18, color='#E53935').encode(
+            x=alt.X('Stage:N', title=None, sort=stages, axis=alt.Axis(labelFontSize=9)),
+            y=alt.Y('Risk %:Q', title=None, scale=alt.Scale(domain=[0, 100]), axis=alt.Axis(labelFontSize=8)),
+            tooltip=['Stage', 'Stations', 'Risk %', 'Expected uncovered', 'P95 uncovered']
+        ).properties(height=200)
+        st.altair_chart(risk_chart, use_container_width=True, theme=None)
+    with risk_table_col:
+        st.markdown("#### By stage")
+        st.dataframe(risk['stages'], use_container_width=True, hide_index=True)
+
+    st.markdown("#### Highest-risk stations")
+    riskiest = risk['stations'].sort_values('Uncovered %', ascending=False, kind='stable').head(20)
+    st.dataframe(riskiest.astype({'ID': 'string'}).fillna(''), use_container_width=True, hide_index=True)
+
 st.markdown("<div style='text-align:center;font-size:0.7rem;color:#666;margin-top:0.5rem;'>OP Dashboard • Full backup details shown</div>", unsafe_allow_html=True)
\ No newline at end of file
@@ -0,0 +1,331 @@
+import json
+import logging
+import os
+from datetime import datetime
+
+import openpyxl
+import pandas as pd
+from openpyxl.utils import get_column_letter
+
+from excel_cache import CACHE_DIR, cached_frame, file_hash
+
+log = logging.getLogger("master_sheet")
+
+# Default column layout of a full-width read of the "Master Sheet" (header on
+# Excel row 3). Positions are 0-based iloc indices into the raw frame.
+# parse_roster() uses the layout detected from the labels instead (see below).
+MASTER_COLUMN_MAP = {
+    'Area': 0,       # Column A - Area
+    'Station': 1,    # Column B - Stations
+    'Name': 3,       # Column E - NAME
+    'ID': 4,         # Column F - ID
+}
+
+# Multi-skill blocks repeat every 5 columns (Name, ID, DOJ, Certification, Days)
+# starting at column I: OP1 -> I/J (8/9), OP2 -> N/O (13/14) ... OP7 -> AM/AN (38/39)
+BACKUP_FIRST_COL = 8
+BACKUP_STRIDE = 5
+BACKUP_NAME_OFFSET = 0
+BACKUP_ID_OFFSET = 1
+
+# current_employees.csv always carries at least this many backup slots
+MIN_BACKUP_SLOTS = 7
+
+
+def backup_slot_columns(n_columns, first_col=BACKUP_FIRST_COL, stride=BACKUP_STRIDE):
+    # Returns [(name_col, id_col), ...] for every complete Name/ID block in the sheet
+    slots = []
+    start = first_col
+    while start + max(BACKUP_NAME_OFFSET, BACKUP_ID_OFFSET) < n_columns:
+        slots.append((start + BACKUP_NAME_OFFSET, start + BACKUP_ID_OFFSET))
+        start += stride
+    return slots
+
+
+def output_columns(n_slots=MIN_BACKUP_SLOTS):
+    columns = ['Area', 'Station', 'Name', 'ID']
+    for k in range(1, max(n_slots, MIN_BACKUP_SLOTS) + 1):
+        columns += [f'Multi_OP{k}_Name', f'Multi_OP{k}_ID']
+    return columns
+
+
+def _text_column(values):
+    # Same text as str(cell) for filled cells, '' for empty ones
+    s = pd.Series(values, dtype=object)
+    filled = s.notna()
+    out = pd.Series('', index=s.index, dtype=object)
+    out[filled] = s[filled].map(str)
+    return out
+
+
+def _raw_column(values):
+    s = pd.Series(values, dtype=object)
+    return s.where(s.notna(), '')
+
+
+def extract_operators(df_raw, column_map=MASTER_COLUMN_MAP, slots=None):
+    # Vectorized replacement for the row-by-row iterrows() extraction.
+    # Every Name/ID block is sliced out of the raw value matrix in one go.
+    values = df_raw.to_numpy(dtype=object)
+    n_rows, n_cols = values.shape
+    if slots is None:
+        slots = backup_slot_columns(n_cols)
+
+    def column(idx):
+        if idx < n_cols:
+            return values[:, idx]
+        return [None] * n_rows
+
+    data = {
+        'Area': _raw_column(column(column_map['Area'])),
+        'Station': _raw_column(column(column_map['Station'])),
+        'Name': _text_column(column(column_map['Name'])),
+        'ID': _text_column(column(column_map['ID'])),
+    }
+
+    n_slots = max(len(slots), MIN_BACKUP_SLOTS)
+    for k in range(n_slots):
+        if k < len(slots):
+            name_col, id_col = slots[k]
+            data[f'Multi_OP{k + 1}_Name'] = _text_column(column(name_col))
+            data[f'Multi_OP{k + 1}_ID'] = _text_column(column(id_col))
+        else:
+            data[f'Multi_OP{k + 1}_Name'] = pd.Series('', index=range(n_rows), dtype=object)
+            data[f'Multi_OP{k + 1}_ID'] = pd.Series('', index=range(n_rows), dtype=object)
+
+    final_df = pd.DataFrame(data, columns=output_columns(n_slots))
+
+    # Remove rows where main Name and ID are both empty
+    final_df = final_df[(final_df['Name'] != '') | (final_df['ID'] != '')]
+    return final_df.reset_index(drop=True)
+
+
+# Layout detection: the header row and the column of every field are found by
+# their labels in the first rows of the sheet, so an inserted row or column no
+# longer shifts Name into ID. Only those columns are then read.
+LAYOUT_SCAN_ROWS = 15
+MAIN_LABELS = {
+    'Area': ('AREA',),
+    'Station': ('STATIONS', 'STATION'),
+    'Name': ('NAME',),
+    'ID': ('ID',),
+}
+
+# Detected layouts per workbook content hash (next to the cached frames)
+LAYOUT_FILE = "layouts.json"
+MAX_LAYOUTS = 50
+
+
+class LayoutError(Exception):
+    pass
+
+
+def _label(value):
+    # "NAME " / "Stations" / "ID" -> "NAME" / "STATIONS" / "ID"
+    return ' '.join(str(value).split()).upper() if value is not None else ''
+
+
+def find_layout(rows, sheet_name='Master Sheet'):
+    # rows: the first rows of the sheet as value lists. Returns
+    # {'sheet', 'header_row' (0-based), 'columns': {field: col}, 'slots': [[name_col, id_col], ...]}
+    closest = None
+    for r, row in enumerate(rows):
+        labels = [_label(v) for v in row]
+        columns = {}
+        for field, accepted in MAIN_LABELS.items():
+            candidates = range(len(labels))
+            if field == 'ID' and 'Name' in columns:
+                # The operator's ID is between NAME and the first multi-skill Name
+                end = next((c for c in range(columns['Name'] + 1, len(labels)) if labels[c] == 'NAME'), len(labels))
+                candidates = range(columns['Name'] + 1, end)
+            col = next((c for c in candidates if labels[c] in accepted), None)
+            if col is not None:
+                columns[field] = col
+        missing = [f for f in MAIN_LABELS if f not in columns]
+        if missing:
+            if columns and (closest is None or len(missing) < len(closest[1])):
+                closest = (r, missing)
+            continue
+
+        # Multi-skill blocks: every Name label right of the operator's ID, paired
+        # with the next ID label (DOJ / Certification / Days columns are skipped)
+        slots, name_col = [], None
+        for c in range(columns['ID'] + 1, len(labels)):
+            if labels[c] == 'NAME':
+                if name_col is not None:
+                    log.warning("'%s': multi-skill Name in column %s has no ID column",
+                                sheet_name, get_column_letter(name_col + 1))
+                name_col = c
+            elif labels[c] == 'ID' and name_col is not None:
+                slots.append([name_col, c])
+                name_col = None
+        if not slots:
+            log.warning("'%s': no multi-skill Name/ID columns right of column %s",
+                        sheet_name, get_column_letter(columns['ID'] + 1))
+        return {'sheet': sheet_name, 'header_row': r, 'columns': columns, 'slots': slots}
+
+    detail = ""
+    if closest is not None:
+        names = ', '.join(MAIN_LABELS[f][0] for f in closest[1])
+        detail = f" (closest is Excel row {closest[0] + 1}, which has no {names})"
+    raise LayoutError(f"'{sheet_name}': no header row with Area, Stations, NAME and ID labels "
+                      f"in the first {len(rows)} rows{detail}")
+
+
+class WorkbookReader:
+    # Opens the workbook (read-only) on first use, so that layout detection and
+    # the column read share one open and fully cached parses never open it
+
+    def __init__(self, path):
+        self.path = path
+        self.wb = None
+
+    def sheet(self, sheet_name):
+        if self.wb is None:
+            self.wb = openpyxl.load_workbook(self.path, read_only=True, data_only=True)
+        if sheet_name not in self.wb.sheetnames:
+            raise LayoutError(f"Sheet '{sheet_name}' not found in {os.path.basename(self.path)} "
+                              f"(sheets: {', '.join(repr(n) for n in self.wb.sheetnames)})")
+        return self.wb[sheet_name]
+
+    def close(self):
+        if self.wb is not None:
+            self.wb.close()
+            self.wb = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def detect_layout(path, sheet_name='Master Sheet', scan_rows=LAYOUT_SCAN_ROWS, book=None):
+    # Parses only the first scan_rows rows of the sheet
+    if book is None:
+        with WorkbookReader(path) as book:
+            return detect_layout(path, sheet_name, scan_rows, book)
+    rows = list(book.sheet(sheet_name).iter_rows(max_row=scan_rows, values_only=True))
+    return find_layout(rows, sheet_name)
+
+
+def _place(col):
+    return get_column_letter(col + 1)
+
+
+def layout_drift(old, new):
+    # Human-readable differences between two layouts of the same sheet
+    changes = []
+    if old['header_row'] != new['header_row']:
+        changes.append(f"header moved from Excel row {old['header_row'] + 1} to row {new['header_row'] + 1}")
+    for field in MAIN_LABELS:
+        if old['columns'][field] != new['columns'][field]:
+            changes.append(f"{field} moved from column {_place(old['columns'][field])} "
+                           f"to {_place(new['columns'][field])}")
+    for k in range(max(len(old['slots']), len(new['slots']))):
+        before = '/'.join(map(_place, old['slots'][k])) if k < len(old['slots']) else None
+        after = '/'.join(map(_place, new['slots'][k])) if k < len(new['slots']) else None
+        if before == after:
+            continue
+        if before is None:
+            changes.append(f"multi-skill OP{k + 1} added in columns {after}")
+        elif after is None:
+            changes.append(f"multi-skill OP{k + 1} (columns {before}) removed")
+        else:
+            changes.append(f"multi-skill OP{k + 1} moved from columns {before} to {after}")
+    return changes
+
+
+def describe_layout(layout):
+    columns = layout['columns']
+    slots = layout['slots']
+    text = (f"header on Excel row {layout['header_row'] + 1}; Area {_place(columns['Area'])}, "
+            f"Stations {_place(columns['Station'])}, NAME {_place(columns['Name'])}, "
+            f"ID {_place(columns['ID'])}; {len(slots)} multi-skill Name/ID blocks")
+    if slots:
+        text += f" ({'/'.join(map(_place, slots[0]))} ... {'/'.join(map(_place, slots[-1]))})"
+    return text
+
+
+def _read_layouts(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, LAYOUT_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _write_layouts(layouts, cache_dir):
+    os.makedirs(cache_dir, exist_ok=True)
+    target = os.path.join(cache_dir, LAYOUT_FILE)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(layouts, f, indent=1)
+    os.replace(tmp, target)
+
+
+def load_layout(path, sheet_name='Master Sheet', content_hash=None, cache_dir=CACHE_DIR, book=None):
+    # Detected layout of one workbook version, cached by content hash. A new
+    # version is compared with the last layout seen for the same workbook name
+    # and sheet; the differences are logged and returned under 'drift'.
+    content_hash = content_hash or file_hash(path)
+    key = f"{content_hash[:24]}:{sheet_name}"
+    layouts = _read_layouts(cache_dir)
+    entry = layouts.get(key)
+    if entry is None:
+        layout = detect_layout(path, sheet_name, book=book)
+        source = os.path.basename(path)
+        previous = [e for e in layouts.values() if e['source'] == source and e['layout']['sheet'] == sheet_name]
+        drift = []
+        if previous:
+            drift = layout_drift(max(previous, key=lambda e: e['detected_at'])['layout'], layout)
+        for change in drift:
+            log.warning("'%s' layout changed in %s: %s", sheet_name, source, change)
+        entry = layouts[key] = {'source': source, 'detected_at': datetime.now().isoformat(),
+                                'layout': layout, 'drift': drift}
+        # Keep the most recent layouts only
+        for old in sorted(layouts, key=lambda k: layouts[k]['detected_at'])[:-MAX_LAYOUTS]:
+            del layouts[old]
+        _write_layouts(layouts, cache_dir)
+    return dict(entry['layout'], fingerprint=content_hash, drift=entry['drift'])
+
+
+def layout_usecols(layout):
+    # Sheet positions of every column the roster needs, in sheet order
+    cols = set(layout['columns'].values())
+    for name_col, id_col in layout['slots']:
+        cols.update((name_col, id_col))
+    return sorted(cols)
+
+
+def layout_positions(layout):
+    # (column_map, slots) for extract_operators() on a frame of layout_usecols() columns
+    position = {col: i for i, col in enumerate(layout_usecols(layout))}
+    column_map = {field: position[col] for field, col in layout['columns'].items()}
+    slots = [(position[name_col], position[id_col]) for name_col, id_col in layout['slots']]
+    return column_map, slots
+
+
+def read_layout_columns(path, layout, book=None):
+    # The data rows below the header, only the layout's columns (labelled by
+    # sheet position). openpyxl's read-only parser still parses every cell of
+    # every row (max_col only filters afterwards), so the XML cost is the same as
+    # a full read; what is saved is pandas' per-cell conversion and the frame of
+    # unused columns. The main speed-up is the Parquet cache in read_layout_cached().
+    if book is None:
+        with WorkbookReader(path) as book:
+            return read_layout_columns(path, layout, book)
+    usecols = layout_usecols(layout)
+    ws = book.sheet(layout['sheet'])
+    # Saved dimensions can be wrong (pandas resets them too)
+    ws.reset_dimensions()
+    rows = [[row[c] if c < len(row) else None for c in usecols]
+            for row in ws.iter_rows(min_row=layout['header_row'] + 2, values_only=True)]
+    return pd.DataFrame(rows, columns=usecols, dtype=object)
+
+
+def read_layout_cached(path, layout, book=None):
+    # Parquet-cached read_layout_columns(), keyed by content hash and layout
+    options = ('layout', layout['sheet'], layout['header_row'], tuple(layout_usecols(layout)))
+    return cached_frame(path, options, lambda p: read_layout_columns(p, layout, book),
+                        content_hash=layout.get('fingerprint'))
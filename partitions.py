@@ -0,0 +1,222 @@
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from urllib.parse import quote
+
+import pandas as pd
+
+from absent_reader import ABSENT_STATUS, AbsentReportError, iter_report_rows
+from attendance_history import report_date
+from master_sheet import LayoutError
+from pipeline import (ROSTER_EXCEL, STAGES, absent_ids_from, aggregate, latest_report, match_absent,
+                      parse_roster, staffed_ids)
+from roster import ID_DTYPE, canonical_ids
+from stage_summary import rollup_stages
+
+# Roster and absence data split by production line and shift, so the dashboard
+# only loads the partition being looked at:
+#   partitions/index.json                         per-partition summaries (plant rollup)
+#   partitions/absences.parquet                   the whole report (operator_id, status, line, shift)
+#   partitions/staffed.parquet                    present main operators of every line
+#   partitions/line=TG-04/shift=G33/roster.parquet
+# Line and shift are the LINE / SHIFT columns of the absentReport, which covers
+# the whole plant; each (line, shift) needs its own Master Sheet workbook.
+# Absences are plant-wide: an operator absent under another LINE tag is still
+# absent as a main operator or backup here, and a present main operator of any
+# line is busy at their own station.
+
+# UPDATE THIS: one roster workbook per (LINE, SHIFT) as written in the absentReport
+LINE_ROSTERS = {
+    ('TG-04', 'G33'): ROSTER_EXCEL,
+}
+
+PARTITION_DIR = "partitions"
+INDEX_FILE = "index.json"
+ABSENCES_FILE = "absences.parquet"
+STAFFED_FILE = "staffed.parquet"
+REPORT_COLUMNS = ('LINE', 'SHIFT')
+# Blank / placeholder LINE or SHIFT cells in the report
+UNASSIGNED = "(none)"
+_PLACEHOLDERS = {'', '-', 'NULL', 'NA', 'N/A'}
+
+
+def partition_path(line, shift, root=PARTITION_DIR):
+    return os.path.join(root, f"line={quote(line, safe=' -_.')}", f"shift={quote(shift, safe=' -_.')}")
+
+
+def report_statuses(report_path):
+    # absentReport -> operator_id, status, line, shift (one row per report line)
+    statuses = pd.DataFrame(list(iter_report_rows(report_path, REPORT_COLUMNS)),
+                            columns=['operator_id', 'status', 'line', 'shift'])
+    statuses['operator_id'] = canonical_ids(statuses['operator_id'])
+    for col in ['line', 'shift']:
+        statuses[col] = statuses[col].where(~statuses[col].str.upper().isin(_PLACEHOLDERS), UNASSIGNED)
+    return statuses
+
+
+def partition_stages(roster):
+    # The usual stage order first, then any other Area this line has
+    areas = [a for a in pd.unique(roster['Area'].dropna()) if str(a).strip()]
+    return [s for s in STAGES if s in areas] + sorted(a for a in areas if a not in STAGES)
+
+
+def _write_parquet(df, path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def _summary(line, shift, result):
+    coverage = result['coverage']
+    return {
+        'line': line,
+        'shift': shift,
+        'total': result['total'],
+        'absent_count': result['absent_count'],
+        'present_count': result['present_count'],
+        'covered': coverage['covered'],
+        'uncovered': coverage['uncovered'],
+        'stages': result['stages'],
+        'stage_df': result['stage_df'].to_dict(orient='records'),
+    }
+
+
+def build_partitions(report_path, line_rosters=LINE_ROSTERS, root=PARTITION_DIR):
+    # Splits one day's report (and the rosters) into partitions; returns the index
+    statuses = report_statuses(report_path)
+    absent_ids = absent_ids_from(statuses)
+    rosters = {key: parse_roster(workbook) for key, workbook in line_rosters.items()}
+    staffed = set().union(*(staffed_ids(roster, absent_ids) for roster in rosters.values()))
+
+    os.makedirs(root, exist_ok=True)
+    _write_parquet(statuses, os.path.join(root, ABSENCES_FILE))
+    _write_parquet(pd.DataFrame({'operator_id': pd.array(sorted(staffed), dtype=ID_DTYPE)}),
+                   os.path.join(root, STAFFED_FILE))
+    partitions = []
+    newest_input = os.path.getmtime(report_path)
+    for (line, shift), roster in rosters.items():
+        result = aggregate(roster, match_absent(roster, absent_ids), absent_ids, partition_stages(roster), staffed)
+
+        target = partition_path(line, shift, root)
+        os.makedirs(target, exist_ok=True)
+        _write_parquet(roster, os.path.join(target, "roster.parquet"))
+        partitions.append(_summary(line, shift, result))
+        newest_input = max(newest_input, os.path.getmtime(line_rosters[(line, shift)]))
+
+    # Absences on lines/shifts without a roster workbook are still counted,
+    # unless the operator runs a station on a rostered line (counted there)
+    rostered = set(line_rosters)
+    mains = set().union(*(roster['ID'].dropna().tolist() for roster in rosters.values()))
+    absent = statuses[(statuses['status'] == ABSENT_STATUS) & ~statuses['operator_id'].isin(mains)]
+    unrostered = [{'line': line, 'shift': shift, 'absent_count': int(count)}
+                  for (line, shift), count in absent.groupby(['line', 'shift']).size().items()
+                  if (line, shift) not in rostered]
+
+    index = {
+        'report_path': report_path,
+        'report_date': report_date(report_path).isoformat(),
+        'data_as_of': datetime.fromtimestamp(newest_input).isoformat(),
+        'built_at': datetime.now().isoformat(),
+        'partitions': partitions,
+        'unrostered': unrostered,
+    }
+    # The index is replaced last, so readers never see a half-built set
+    index_path = os.path.join(root, INDEX_FILE)
+    tmp = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp, index_path)
+    return index
+
+
+def read_index(root=PARTITION_DIR):
+    try:
+        with open(os.path.join(root, INDEX_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def load_partition(line, shift, root=PARTITION_DIR, index=None):
+    # One line/shift, in the same shape as pipeline.aggregate() output
+    index = index or read_index(root)
+    summary = next(p for p in index['partitions'] if p['line'] == line and p['shift'] == shift)
+    roster = pd.read_parquet(os.path.join(partition_path(line, shift, root), "roster.parquet"))
+    statuses = pd.read_parquet(os.path.join(root, ABSENCES_FILE), columns=['operator_id', 'status'])
+    staffed = set(pd.read_parquet(os.path.join(root, STAFFED_FILE))['operator_id'].tolist())
+
+    absent_ids = absent_ids_from(statuses)
+    result = aggregate(roster, match_absent(roster, absent_ids), absent_ids, summary['stages'], staffed)
+    result.update({
+        'line': line,
+        'shift': shift,
+        'report_path': index['report_path'],
+        'report_date': datetime.fromisoformat(index['report_date']).date(),
+        'data_as_of': datetime.fromisoformat(index['data_as_of']),
+        'loaded_at': datetime.now(),
+    })
+    return result
+
+
+def plant_rollup(index):
+    # Plant-wide totals from the per-partition summaries in the index only
+    partitions = index['partitions']
+    rows = [{
+        'Line': p['line'],
+        'Shift': p['shift'],
+        'Total': p['total'],
+        'Present': p['present_count'],
+        'Absent': p['absent_count'],
+        'Present %': round(p['present_count'] / p['total'] * 100, 1) if p['total'] else 0,
+        'Covered': p['covered'],
+        'Uncovered': p['uncovered'],
+    } for p in partitions]
+    by_partition = pd.DataFrame(rows, columns=['Line', 'Shift', 'Total', 'Present', 'Absent', 'Present %',
+                                               'Covered', 'Uncovered'])
+
+    areas = []
+    for p in partitions:
+        areas += [s for s in p['stages'] if s not in areas]
+    stage_df = rollup_stages([pd.DataFrame(p['stage_df']) for p in partitions],
+                             [s for s in STAGES if s in areas] + [a for a in areas if a not in STAGES])
+
+    total = int(by_partition['Total'].sum())
+    absent_count = int(by_partition['Absent'].sum())
+    return {
+        'by_partition': by_partition,
+        'stage_df': stage_df,
+        'unrostered': pd.DataFrame(index['unrostered'], columns=['line', 'shift', 'absent_count']),
+        'total': total,
+        'absent_count': absent_count,
+        'present_count': total - absent_count,
+        'covered': int(by_partition['Covered'].sum()),
+        'uncovered': int(by_partition['Uncovered'].sum()),
+        'report_date': datetime.fromisoformat(index['report_date']).date(),
+        'data_as_of': datetime.fromisoformat(index['data_as_of']),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Split roster and absences into line/shift partitions")
+    parser.add_argument("--report", default=None, help="absentReport file (default: latest in this folder)")
+    parser.add_argument("--root", default=PARTITION_DIR)
+    args = parser.parse_args()
+
+    report_path = args.report or latest_report(".")
+    if report_path is None:
+        print("ERROR: no 'absentReport YYYY-MM-DD.xlsx' found", file=sys.stderr)
+        sys.exit(1)
+    try:
+        index = build_partitions(report_path, root=args.root)
+    except (FileNotFoundError, AbsentReportError, LayoutError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    rollup = plant_rollup(index)
+    print(f"{len(index['partitions'])} partitions in '{args.root}' for {rollup['report_date']}")
+    print(rollup['by_partition'].to_string(index=False))
+    if len(rollup['unrostered']):
+        print("\nAbsent on lines/shifts without a roster workbook:")
+        print(rollup['unrostered'].to_string(index=False))
@@ -0,0 +1,229 @@
+import argparse
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+from absent_reader import ABSENT_STATUS, AbsentReportError, iter_id_status
+from attendance_history import ingest_report, report_date
+from backup_coverage import compute_coverage
+from daily_snapshots import DAILY_DIR, save_day
+from roster_versions import VERSION_DIR, save_version
+from diagnostics import run_trace, span
+from master_sheet import (LayoutError, WorkbookReader, extract_operators, layout_positions, load_layout,
+                          read_layout_cached)
+from roster import canonical_ids, canonicalize
+from skill_index import SkillIndex
+from skill_table import write_skill_table
+from stage_summary import aggregate_stages
+
+# In-memory roster -> absences -> match -> aggregate pipeline. Every stage is a
+# plain function over DataFrames; CSV/Parquet output only happens in persist().
+
+ROSTER_EXCEL = "Stationwise Manpower & Multi-Skilled Deplyoment For Dasboardx.xlsx"
+ROSTER_SHEET = "Master Sheet"
+
+CURRENT_CSV = "current_employees.csv"
+ABSENT_CSV = "actual_absent_manpower.csv"
+
+STAGES = ['CG', 'Offline', 'Assy', 'Testing', 'Packout']
+
+
+def discover_reports(folder):
+    # Every "absentReport YYYY-MM-DD.xlsx" in a folder, oldest first
+    reports = []
+    for name in os.listdir(folder):
+        # Skip Excel lock files such as "~$absentReport 2026-01-19.xlsx"
+        if name.startswith('~$') or not name.startswith('absentReport') or not name.endswith('.xlsx'):
+            continue
+        try:
+            report_date(name)
+        except ValueError:
+            continue
+        reports.append(os.path.join(folder, name))
+    return sorted(reports, key=report_date)
+
+
+def latest_report(folder="."):
+    reports = discover_reports(folder)
+    return reports[-1] if reports else None
+
+
+def parse_roster(excel_file=ROSTER_EXCEL, sheet_name=ROSTER_SHEET, layout=None, book=None):
+    # Master Sheet -> canonical roster (Int64 IDs, categorical Area/Station).
+    # The header row and columns are found by label (master_sheet.load_layout)
+    # and only the Area/Station/NAME/ID and multi-skill Name/ID columns are read.
+    if book is None:
+        # The workbook is opened at most once, and only if something is not cached
+        with WorkbookReader(excel_file) as book:
+            return parse_roster(excel_file, sheet_name, layout, book)
+    with run_trace('parse_roster'):
+        if layout is None:
+            with span('layout_detect'):
+                layout = load_layout(excel_file, sheet_name, book=book)
+        with span('excel_read') as s:
+            df_raw = s['rows_out'] = read_layout_cached(excel_file, layout, book)
+        with span('dropna', rows_in=df_raw) as s:
+            df_raw = s['rows_out'] = df_raw.dropna(how='all').reset_index(drop=True)
+        with span('row_extraction', rows_in=df_raw) as s:
+            column_map, slots = layout_positions(layout)
+            roster = s['rows_out'] = extract_operators(df_raw, column_map, slots)
+        with span('id_cleanup', rows_in=roster) as s:
+            roster = s['rows_out'] = canonicalize(roster)
+    return roster
+
+
+def parse_absences(report_path):
+    # absentReport -> one (operator_id, status) row per report line
+    with run_trace('parse_absences'):
+        with span('absent_read') as s:
+            statuses = s['rows_out'] = pd.DataFrame(list(iter_id_status(report_path)), columns=['operator_id', 'status'])
+        with span('absent_id_cleanup', rows_in=statuses) as s:
+            statuses['operator_id'] = canonical_ids(statuses['operator_id'])
+            s['rows_out'] = statuses
+    return statuses
+
+
+def absent_ids_from(statuses, status=ABSENT_STATUS):
+    absent = statuses.loc[statuses['status'] == status, 'operator_id']
+    return set(absent.dropna().tolist())
+
+
+def match_absent(roster, absent_ids):
+    # Roster rows whose main operator is absent, with all backup columns
+    with span('absent_matching', rows_in=roster) as s:
+        roster = roster[roster['ID'].notna()]
+        absent_df = roster[roster['ID'].isin(absent_ids)].copy()
+        absent_df.sort_values(by=['Area', 'Station', 'Name'], inplace=True)
+        absent_df.reset_index(drop=True, inplace=True)
+        s['rows_out'] = absent_df
+    return absent_df
+
+
+def staffed_ids(roster, absent_ids):
+    # Present main operators: they are running their own station, so moving
+    # one to cover an absence would only leave another station empty
+    return set(roster['ID'].dropna().tolist()) - set(absent_ids)
+
+
+def aggregate(current_df, absent_df, absent_ids=None, stages=STAGES, staffed=None):
+    # Everything the dashboard shows, for the given Areas
+    if absent_ids is None:
+        # Only absent main operators are known (e.g. from the CSVs), so
+        # backups outside that set are assumed present
+        absent_ids = set(absent_df['ID'].dropna().tolist())
+    if staffed is None:
+        staffed = staffed_ids(current_df, absent_ids)
+    current_df = current_df[current_df['Area'].isin(stages)]
+    absent_df = absent_df[absent_df['Area'].isin(stages)]
+
+    total = int(current_df['ID'].notna().sum())
+    absent_count = len(absent_df)
+    with run_trace('aggregate'):
+        with span('stage_aggregation', rows_in=current_df) as s:
+            stage_df = s['rows_out'] = aggregate_stages(current_df, absent_df, stages)
+        with span('coverage', rows_in=absent_df) as s:
+            coverage = compute_coverage(absent_df, absent_ids, staffed)
+            s['rows_out'] = coverage['plan']
+        with span('skill_index', rows_in=current_df):
+            skill_index = SkillIndex.from_roster(current_df)
+    return {
+        'current_df': current_df,
+        'absent_df': absent_df,
+        'stage_df': stage_df,
+        'coverage': coverage,
+        'skill_index': skill_index,
+        # Every absent ID of the day (main operators and backups, any station)
+        'absent_ids': absent_ids,
+        'total': total,
+        'absent_count': absent_count,
+        'present_count': total - absent_count,
+        'stages': list(stages),
+    }
+
+
+def run(roster_excel=ROSTER_EXCEL, report_path=None, stages=STAGES):
+    # Full refresh in one call: nothing is written to disk
+    if report_path is None:
+        report_path = latest_report(os.path.dirname(os.path.abspath(roster_excel)))
+        if report_path is None:
+            raise FileNotFoundError("No 'absentReport YYYY-MM-DD.xlsx' found next to the roster workbook")
+
+    with run_trace('pipeline.run'):
+        roster = parse_roster(roster_excel)
+        statuses = parse_absences(report_path)
+        absent_ids = absent_ids_from(statuses)
+        absent_df = match_absent(roster, absent_ids)
+
+        result = aggregate(roster, absent_df, absent_ids, stages)
+    result.update({
+        'roster': roster,
+        'roster_excel': roster_excel,
+        'all_absent_df': absent_df,
+        'statuses': statuses,
+        'report_path': report_path,
+        'report_date': report_date(report_path),
+        'data_as_of': datetime.fromtimestamp(max(os.path.getmtime(roster_excel), os.path.getmtime(report_path))),
+        'loaded_at': datetime.now(),
+    })
+    return result
+
+
+def persist(result, current_csv=CURRENT_CSV, absent_csv=ABSENT_CSV, skill_table=True, history=True,
+            daily_dir=DAILY_DIR, versions_dir=VERSION_DIR):
+    # Optional outputs for the CSV-based tools, the attendance history, the
+    # daily snapshots and the roster versions
+    written = []
+    if current_csv:
+        result['roster'].to_csv(current_csv, index=False)
+        written.append(current_csv)
+    if absent_csv:
+        result['all_absent_df'].to_csv(absent_csv, index=False)
+        written.append(absent_csv)
+    if skill_table:
+        write_skill_table(result['roster'])
+    if history:
+        statuses = result['statuses'].dropna(subset=['operator_id'])
+        ingest_report(result['report_path'], result['roster'],
+                      statuses=list(statuses.itertuples(index=False, name=None)))
+    if daily_dir:
+        save_day(result, root=daily_dir)
+    if versions_dir:
+        roster_excel = result['roster_excel']
+        save_version(result['roster'], datetime.fromtimestamp(os.path.getmtime(roster_excel)), roster_excel,
+                     versions_dir)
+    return written
+
+
+def summary_line(result):
+    total, absent = result['total'], result['absent_count']
+    rate = round(result['present_count'] / total * 100, 1) if total else 0
+    return (f"{result['report_date']:%Y-%m-%d}: {total} operators, {absent} absent, "
+            f"{result['present_count']} present ({rate}%), "
+            f"{result['coverage']['covered']} covered / {result['coverage']['uncovered']} uncovered")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Roster -> absences -> dashboard summary, in one pass")
+    parser.add_argument("--roster", default=ROSTER_EXCEL, help="Stationwise Manpower workbook")
+    parser.add_argument("--report", default=None, help="absentReport file (default: latest in the roster's folder)")
+    parser.add_argument("--persist", action="store_true", help="write the CSVs, skill table, attendance history, daily snapshot and roster version")
+    parser.add_argument("--publish", action="store_true", help="publish a snapshot for the dashboard workers")
+    parser.add_argument("--quiet", action="store_true", help="no output unless there is an error")
+    args = parser.parse_args()
+
+    try:
+        result = run(args.roster, args.report)
+    except (FileNotFoundError, AbsentReportError, LayoutError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    written = persist(result) if args.persist else []
+    if args.publish:
+        from snapshot import SNAPSHOT_DIR, publish_snapshot
+        written.append(os.path.join(SNAPSHOT_DIR, publish_snapshot(result)))
+    if not args.quiet:
+        print(summary_line(result))
+        print(result['stage_df'].to_string(index=False))
+        if written:
+            print("Wrote:", ", ".join(written))
@@ -0,0 +1,223 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from attendance_history import HISTORY_DIR, ingested_dates, query
+from pipeline import STAGES
+from roster import backup_slots, canonical_ids
+
+# Monte Carlo staffing risk: how likely is each station / stage to end up with
+# an absent main operator and no present backup to cover it?
+# Every scenario draws each operator's absence independently from their
+# historical absence rate; scenarios are columns of NumPy boolean matrices, so
+# one pass over the stations evaluates all of them at once.
+# Backups cover one station each, and a main operator is never a backup: when
+# present they are running their own station. Backups are first assigned
+# greedily by priority (all B1, then B2, ...) across all scenarios at once;
+# only scenarios where an uncovered station still has a present (but taken)
+# backup are re-solved exactly, with augmenting paths from the greedy
+# assignment.
+
+N_SCENARIOS = 10_000
+DEFAULT_ABSENCE_RATE = 0.08   # used when there is no attendance history yet
+PRIOR_DAYS = 5                # shrinks short histories towards the plant rate
+SAMPLE_CHUNK = 512            # operators sampled per batch (bounds temporary memory)
+
+STATION_RISK_COLUMNS = ['Area', 'Station', 'Name', 'ID', 'Backups', 'Absence %', 'Uncovered %']
+STAGE_RISK_COLUMNS = ['Stage', 'Stations', 'Risk %', 'Expected uncovered', 'P95 uncovered']
+
+
+def absence_rates(history_dir=HISTORY_DIR, prior_days=PRIOR_DAYS):
+    # (rates per operator_id, plant rate, days). The report lists absentees
+    # plant-wide, so an operator missing from a day's report was present.
+    days = ingested_dates(history_dir)
+    if not days:
+        return pd.Series(dtype='float64'), DEFAULT_ABSENCE_RATE, 0
+    rows = query(history_dir=history_dir, columns=['operator_id', 'absent', 'in_roster'])
+    n_days = len(days)
+    roster_rows = rows[rows['in_roster']]
+    plant_rate = float(roster_rows['absent'].mean()) if len(roster_rows) else DEFAULT_ABSENCE_RATE
+    # Operators count from the days they were on the roster, so a late joiner's
+    # absences are not spread over days before they joined (and perfect
+    # attendance counts as 0 absent days). Backups with no station of their
+    # own are only in the report when absent; every history day counts for them.
+    absent_days = roster_rows.groupby('operator_id')['absent'].sum()
+    observed_days = roster_rows.groupby('operator_id').size()
+    off_roster = rows[~rows['operator_id'].isin(observed_days.index)]
+    off_roster_absent = off_roster.groupby('operator_id')['absent'].sum()
+    absent_days = pd.concat([absent_days, off_roster_absent])
+    observed_days = pd.concat([observed_days, pd.Series(n_days, index=off_roster_absent.index)])
+    # Beta-style smoothing: a single absence in two days is not a 50% rate
+    rates = (absent_days + prior_days * plant_rate) / (observed_days + prior_days)
+    return rates, plant_rate, n_days
+
+
+def _roster_arrays(roster):
+    # Station -> operator codes: main (n_stations,), backups (n_stations, n_slots) with -1 for blanks
+    slots = backup_slots(roster)
+    main = canonical_ids(roster['ID'])
+    backups = [canonical_ids(roster[id_col]) for _, _, id_col in slots]
+    all_ids = pd.concat([main] + backups, ignore_index=True)
+    codes, operators = pd.factorize(all_ids, use_na_sentinel=True)
+    n = len(roster)
+    main_codes = codes[:n]
+    backup_codes = codes[n:].reshape(len(slots), n).T if slots else np.empty((n, 0), dtype=codes.dtype)
+    return main_codes, backup_codes, operators
+
+
+def _sample_absences(rates, n_scenarios, rng):
+    # (n_operators, n_scenarios) boolean matrix, operator-major so each
+    # operator's scenarios are one contiguous row
+    absent = np.empty((len(rates), n_scenarios), dtype=bool)
+    for start in range(0, len(rates), SAMPLE_CHUNK):
+        chunk = rates[start:start + SAMPLE_CHUNK]
+        draws = rng.random((len(chunk), n_scenarios), dtype=np.float32)
+        np.less(draws, chunk[:, None], out=absent[start:start + SAMPLE_CHUNK])
+    return absent
+
+
+def _greedy(main_codes, backup_codes, absent):
+    # Vectorized over scenarios: returns (uncovered, assigned backup code or -1)
+    uncovered = absent[main_codes]
+    assigned = np.full(uncovered.shape, -1, dtype=np.int32)
+    available = ~absent
+    for slot in range(backup_codes.shape[1]):
+        for s in np.flatnonzero(backup_codes[:, slot] >= 0):
+            need = uncovered[s]
+            if not need.any():
+                continue
+            b = backup_codes[s, slot]
+            take = need & available[b]
+            assigned[s, take] = b
+            need &= ~take                 # updates uncovered[s] in place
+            available[b] &= ~take
+    return uncovered, assigned
+
+
+def _contended(uncovered, backup_codes, absent):
+    # Scenarios where some uncovered station has a present backup (already
+    # used elsewhere by the greedy pass), i.e. where a reshuffle might help
+    contended = np.zeros(uncovered.shape[1], dtype=bool)
+    for slot in range(backup_codes.shape[1]):
+        has_backup = np.flatnonzero(backup_codes[:, slot] >= 0)
+        present_backup = ~absent[backup_codes[has_backup, slot]]
+        contended |= (uncovered[has_backup] & present_backup).any(axis=0)
+    return np.flatnonzero(contended)
+
+
+def _augment(start, backups, owner, absent_j):
+    # Kuhn's augmenting path from station start, as an explicit-stack DFS so
+    # long chains of backups cannot hit the recursion limit. On success every
+    # station on the path takes the backup it tried and owner is updated.
+    visited = set()
+    stack = [[start, iter(backups[start]), None]]   # station, remaining backups, backup tried
+    while stack:
+        frame = stack[-1]
+        for b in frame[1]:
+            if absent_j[b] or b in visited:
+                continue
+            visited.add(b)
+            frame[2] = b
+            t = owner.get(b)
+            if t is None:
+                for s, _, taken in stack:
+                    owner[taken] = s
+                return True
+            stack.append([t, iter(backups[t]), None])
+            break
+        else:
+            stack.pop()
+    return False
+
+
+def uncovered_matrix(main_codes, backup_codes, absent):
+    # (n_stations, n_scenarios): main absent and no present backup can be matched
+    is_main = np.zeros(absent.shape[0], dtype=bool)
+    is_main[main_codes[main_codes >= 0]] = True
+    backup_codes = np.where((backup_codes >= 0) & ~is_main[backup_codes], backup_codes, -1)
+    uncovered, assigned = _greedy(main_codes, backup_codes, absent)
+    backups = [list(dict.fromkeys(b for b in row if b >= 0)) for row in backup_codes.tolist()]
+
+    for j in _contended(uncovered, backup_codes, absent):
+        # Augmenting paths from the greedy matching (Kuhn): a station that
+        # cannot be reached now will not become reachable later, so one try
+        # per uncovered station gives a maximum matching
+        absent_j = absent[:, j]
+        column = assigned[:, j]
+        matched = np.flatnonzero(column >= 0)
+        owner = dict(zip(column[matched].tolist(), matched.tolist()))
+
+        for s in np.flatnonzero(uncovered[:, j]).tolist():
+            if _augment(s, backups, owner, absent_j):
+                uncovered[s, j] = False
+    return uncovered
+
+
+def simulate(roster, rates=None, plant_rate=DEFAULT_ABSENCE_RATE, n_scenarios=N_SCENARIOS,
+             stages=STAGES, seed=0):
+    # Per-station and per-stage risk over n_scenarios sampled days
+    roster = roster[roster['ID'].notna() & roster['Area'].isin(stages)].reset_index(drop=True)
+    main_codes, backup_codes, operators = _roster_arrays(roster)
+    if rates is None:
+        rates = pd.Series(dtype='float64')
+    operator_rates = rates.reindex(np.asarray(operators, dtype='int64')).fillna(plant_rate).to_numpy(dtype='float64')
+
+    rng = np.random.default_rng(seed)
+    # Sampling compares against float32 draws; the reported rates stay float64
+    absent = _sample_absences(operator_rates.astype(np.float32), n_scenarios, rng)
+    uncovered = uncovered_matrix(main_codes, backup_codes, absent)
+
+    stations = pd.DataFrame({
+        'Area': roster['Area'],
+        'Station': roster['Station'],
+        'Name': roster['Name'],
+        'ID': roster['ID'],
+        'Backups': (backup_codes >= 0).sum(axis=1),
+        'Absence %': (operator_rates[main_codes] * 100).round(1),
+        'Uncovered %': (uncovered.mean(axis=1) * 100).round(1),
+    }, columns=STATION_RISK_COLUMNS)
+
+    stage_rows = []
+    areas = roster['Area'].to_numpy()
+    for stage in stages:
+        in_stage = areas == stage
+        counts = uncovered[in_stage].sum(axis=0)
+        stage_rows.append({
+            'Stage': stage,
+            'Stations': int(in_stage.sum()),
+            'Risk %': round(float((counts > 0).mean()) * 100, 1),
+            'Expected uncovered': round(float(counts.mean()), 2),
+            'P95 uncovered': int(np.percentile(counts, 95)) if len(counts) else 0,
+        })
+
+    return {
+        'stations': stations,
+        'stages': pd.DataFrame(stage_rows, columns=STAGE_RISK_COLUMNS),
+        'plant_risk': round(float(uncovered.any(axis=0).mean()) * 100, 1),
+        'n_scenarios': n_scenarios,
+        'plant_rate': plant_rate,
+    }
+
+
+if __name__ == "__main__":
+    from roster import load_roster
+
+    parser = argparse.ArgumentParser(description="Monte Carlo staffing risk per station and stage")
+    parser.add_argument("roster_csv", nargs="?", default="current_employees.csv")
+    parser.add_argument("--scenarios", type=int, default=N_SCENARIOS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rates, plant_rate, n_days = absence_rates()
+    start = time.perf_counter()
+    risk = simulate(load_roster(args.roster_csv), rates, plant_rate, args.scenarios, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.scenarios} scenarios in {elapsed:.2f}s; absence rates from {n_days} day(s) of history "
+          f"(plant rate {plant_rate:.1%})")
+    print(risk['stages'].to_string(index=False))
+    print(f"\nP(any station uncovered): {risk['plant_risk']}%")
+    print("\nHighest-risk stations:")
+    print(risk['stations'].sort_values('Uncovered %', ascending=False).head(10).to_string(index=False))
@@ -0,0 +1,61 @@
+import re
+
+import pandas as pd
+from pandas.api.types import is_float_dtype, is_integer_dtype
+
+# Shared roster schema for Operator_details.py, generate_absent_csv.py and the
+# dashboard. Operator IDs are canonicalized once into nullable Int64, so
+# "373740.0", 373740.0 and " 373740 " are the same key, and Area/Station are
+# categoricals instead of repeated strings.
+
+ID_DTYPE = 'Int64'
+CATEGORY_COLUMNS = ['Area', 'Station']
+
+_ID_COLUMN = re.compile(r'(ID|Multi_OP\d+_ID)$')
+_BACKUP_COLUMN = re.compile(r'Multi_OP(\d+)_(?:Name|ID)$')
+
+
+def id_columns(df):
+    return [c for c in df.columns if _ID_COLUMN.match(str(c))]
+
+
+def backup_slots(df):
+    # [(k, 'Multi_OPk_Name', 'Multi_OPk_ID'), ...] in priority order, for
+    # however many multi-skill slots the frame has
+    slots = sorted({int(m.group(1)) for m in map(_BACKUP_COLUMN.match, map(str, df.columns)) if m})
+    return [(k, f'Multi_OP{k}_Name', f'Multi_OP{k}_ID') for k in slots]
+
+
+def canonical_ids(values):
+    # Any ID representation -> Int64; blanks and non-numeric IDs become <NA>
+    s = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+    if is_integer_dtype(s.dtype):
+        return s.astype(ID_DTYPE)
+    if not is_float_dtype(s.dtype):
+        text = s.astype('string').str.strip()
+        s = pd.to_numeric(text.str.replace(r'\.0+$', '', regex=True), errors='coerce')
+        if is_integer_dtype(s.dtype):
+            return s.astype(ID_DTYPE)
+    s = s.astype('Float64')
+    return s.where(s.round() == s).astype(ID_DTYPE)
+
+
+def canonicalize(df):
+    # In place: all ID columns -> Int64, Area/Station -> category
+    for col in id_columns(df):
+        df[col] = canonical_ids(df[col])
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def load_roster(path):
+    # current_employees.csv / actual_absent_manpower.csv -> typed roster frame
+    df = pd.read_csv(path, dtype='string')
+    return canonicalize(df)
+
+
+def format_ids(ids):
+    # Int64 IDs -> display text with blanks for missing IDs
+    return ids.astype('string').fillna('')
@@ -0,0 +1,241 @@
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from roster import backup_slots
+
+# Every roster build is kept as a version, so joiners, leavers, station moves
+# and backup changes can be derived instead of typed in:
+#   roster_versions/index.json                 versions in as_of order + diff counts
+#   roster_versions/v20260119-054519-1a2b3c4d.parquet       full roster
+#   roster_versions/changes/v20260119-054519-1a2b3c4d.parquet   diff against the previous version
+# A build identical to the latest version is not stored again. Each diff is
+# computed once, when its version is saved, so monthly attrition only reads
+# the counts in the index, however many versions there are.
+VERSION_DIR = "roster_versions"
+INDEX_FILE = "index.json"
+CHANGES_DIR = "changes"
+
+CHANGE_COLUMNS = ['Change', 'ID', 'Name', 'Area', 'Station', 'From', 'To']
+ATTRITION_COLUMNS = ['Month', 'Stations', 'Headcount', 'Joiners', 'Leavers', 'Attrition %']
+
+
+def content_hash(roster):
+    # Row order matters (it is the sheet order) but the index does not
+    rows = pd.util.hash_pandas_object(roster.astype('string'), index=False)
+    return hashlib.sha1(rows.to_numpy().tobytes() + ','.join(map(str, roster.columns)).encode()).hexdigest()
+
+
+def _placements(roster):
+    # (ID, Placement) pairs of the main operators, Placement = "Area / Station"
+    main = roster.loc[roster['ID'].notna(), ['ID', 'Name', 'Area', 'Station']]
+    station = main['Area'].astype('string').fillna('') + ' / ' + main['Station'].astype('string').fillna('')
+    return main.assign(Placement=station).drop_duplicates(['ID', 'Placement'])
+
+
+def _placement_text(pairs, ids):
+    # "Area / Station; ..." per ID, joined only for the given (changed) IDs
+    pairs = pairs[pairs['ID'].isin(ids)].sort_values('Placement')
+    return pairs.groupby('ID', sort=False)['Placement'].agg('; '.join)
+
+
+def _backup_edges(roster):
+    # (Area, Station, backup ID) -> priority slot, for every filled Multi_OP slot
+    frames = []
+    for k, name_col, id_col in backup_slots(roster):
+        edge = roster.loc[roster[id_col].notna(), ['Area', 'Station', id_col]].rename(columns={id_col: 'ID'})
+        edge['Name'] = roster.loc[edge.index, name_col] if name_col in roster.columns else pd.NA
+        edge['Slot'] = f"B{k}"
+        frames.append(edge)
+    if not frames:
+        return pd.DataFrame(columns=['Area', 'Station', 'ID', 'Name', 'Slot'])
+    edges = pd.concat(frames, ignore_index=True)
+    for col in ['Area', 'Station']:
+        edges[col] = edges[col].astype('string')
+    # An operator listed twice for one station counts once, at the higher priority
+    return edges.drop_duplicates(['Area', 'Station', 'ID'])
+
+
+def diff_rosters(old, new):
+    # Hash joins on canonical ID (placements) and on (Area, Station, ID) (backups)
+    old_pairs, new_pairs = _placements(old), _placements(new)
+    people = ['ID', 'Name', 'Area', 'Station']
+    placed = old_pairs.drop_duplicates('ID')[people].merge(
+        new_pairs.drop_duplicates('ID')[people], on='ID', how='outer', suffixes=('_old', '_new'), indicator=True)
+    # A move is any change in an operator's set of stations
+    pairs = old_pairs[['ID', 'Placement']].merge(new_pairs[['ID', 'Placement']], how='outer', indicator=True)
+    changed = pairs.loc[pairs['_merge'] != 'both', 'ID']
+    leavers = placed[placed['_merge'] == 'left_only']
+    joiners = placed[placed['_merge'] == 'right_only']
+    moved = placed[(placed['_merge'] == 'both') & placed['ID'].isin(changed)]
+    before = _placement_text(old_pairs, pd.concat([leavers['ID'], moved['ID']]))
+    after = _placement_text(new_pairs, pd.concat([joiners['ID'], moved['ID']]))
+
+    edges = _backup_edges(old).merge(_backup_edges(new), on=['Area', 'Station', 'ID'], how='outer',
+                                     suffixes=('_old', '_new'), indicator=True)
+    removed = edges[edges['_merge'] == 'left_only']
+    added = edges[edges['_merge'] == 'right_only']
+    reprioritized = edges[(edges['_merge'] == 'both') & (edges['Slot_old'] != edges['Slot_new'])]
+
+    frames = [
+        pd.DataFrame({'Change': 'joiner', 'ID': joiners['ID'], 'Name': joiners['Name_new'],
+                      'Area': joiners['Area_new'], 'Station': joiners['Station_new'],
+                      'From': '', 'To': joiners['ID'].map(after)}),
+        pd.DataFrame({'Change': 'leaver', 'ID': leavers['ID'], 'Name': leavers['Name_old'],
+                      'Area': leavers['Area_old'], 'Station': leavers['Station_old'],
+                      'From': leavers['ID'].map(before), 'To': ''}),
+        pd.DataFrame({'Change': 'station_move', 'ID': moved['ID'], 'Name': moved['Name_new'],
+                      'Area': moved['Area_new'], 'Station': moved['Station_new'],
+                      'From': moved['ID'].map(before), 'To': moved['ID'].map(after)}),
+        pd.DataFrame({'Change': 'backup_added', 'ID': added['ID'], 'Name': added['Name_new'],
+                      'Area': added['Area'], 'Station': added['Station'], 'From': '', 'To': added['Slot_new']}),
+        pd.DataFrame({'Change': 'backup_removed', 'ID': removed['ID'], 'Name': removed['Name_old'],
+                      'Area': removed['Area'], 'Station': removed['Station'], 'From': removed['Slot_old'], 'To': ''}),
+        pd.DataFrame({'Change': 'backup_priority', 'ID': reprioritized['ID'], 'Name': reprioritized['Name_new'],
+                      'Area': reprioritized['Area'], 'Station': reprioritized['Station'],
+                      'From': reprioritized['Slot_old'], 'To': reprioritized['Slot_new']}),
+    ]
+    changes = pd.concat([f.astype({c: 'string' for c in CHANGE_COLUMNS if c != 'ID'}) for f in frames],
+                        ignore_index=True)
+    changes['ID'] = changes['ID'].astype('Int64')
+    return changes[CHANGE_COLUMNS]
+
+
+def change_counts(changes):
+    counts = changes['Change'].value_counts()
+    return {
+        'joiners': int(counts.get('joiner', 0)),
+        'leavers': int(counts.get('leaver', 0)),
+        'station_moves': int(counts.get('station_move', 0)),
+        'backup_changes': int(counts.get('backup_added', 0) + counts.get('backup_removed', 0)
+                              + counts.get('backup_priority', 0)),
+    }
+
+
+def read_index(root=VERSION_DIR):
+    try:
+        with open(os.path.join(root, INDEX_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'versions': []}
+
+
+def _write_index(index, root):
+    index_path = os.path.join(root, INDEX_FILE)
+    tmp = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp, index_path)
+
+
+def _write_parquet(df, path):
+    # Readers (and a crash) only ever see a complete file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def load_version(version, root=VERSION_DIR):
+    return pd.read_parquet(os.path.join(root, f"{version}.parquet"))
+
+
+def load_changes(version, root=VERSION_DIR):
+    return pd.read_parquet(os.path.join(root, CHANGES_DIR, f"{version}.parquet"))
+
+
+def _store_diff(entry, previous, roster, root):
+    # Diff against the previous version (the first version has no changes)
+    changes = diff_rosters(previous, roster) if previous is not None else pd.DataFrame(columns=CHANGE_COLUMNS)
+    _write_parquet(changes, os.path.join(root, CHANGES_DIR, f"{entry['version']}.parquet"))
+    entry.update(change_counts(changes))
+
+
+def save_version(roster, as_of=None, source=None, root=VERSION_DIR):
+    # Stores a roster build; returns its version, or None if nothing changed.
+    # as_of is when the roster took effect (e.g. the workbook's mtime).
+    as_of = as_of or datetime.now()
+    digest = content_hash(roster)
+    index = read_index(root)
+    versions = index['versions']
+    # Position by as_of, so a backfilled older workbook lands in the right place
+    position = sum(1 for v in versions if v['as_of'] <= as_of.isoformat())
+    if position and versions[position - 1]['content_hash'] == digest:
+        return None
+
+    os.makedirs(os.path.join(root, CHANGES_DIR), exist_ok=True)
+    version = f"v{as_of:%Y%m%d-%H%M%S}-{digest[:8]}"
+    _write_parquet(roster, os.path.join(root, f"{version}.parquet"))
+    entry = {
+        'version': version,
+        'as_of': as_of.isoformat(),
+        'saved_at': datetime.now().isoformat(),
+        'source': source,
+        'content_hash': digest,
+        'operators': int(roster['ID'].dropna().nunique()),
+        'stations': int(len(roster)),
+        'previous': versions[position - 1]['version'] if position else None,
+    }
+    previous = load_version(entry['previous'], root) if position else None
+    _store_diff(entry, previous, roster, root)
+    versions.insert(position, entry)
+
+    # A version inserted before existing ones changes its successor's diff
+    if position + 1 < len(versions):
+        successor = versions[position + 1]
+        successor['previous'] = version
+        _store_diff(successor, roster, load_version(successor['version'], root), root)
+    _write_index(index, root)
+    return version
+
+
+def monthly_attrition(root=VERSION_DIR, index=None):
+    # Leavers per month over the average of the month's opening and closing
+    # headcount; months without a new version carry the headcount forward
+    index = index or read_index(root)
+    versions = index['versions']
+    if len(versions) < 2:
+        return pd.DataFrame(columns=ATTRITION_COLUMNS)
+    df = pd.DataFrame(versions)
+    df['Month'] = pd.to_datetime(df['as_of']).dt.to_period('M')
+    months = pd.period_range(df['Month'].min(), df['Month'].max(), freq='M')
+    by_month = df.groupby('Month').agg(
+        Joiners=('joiners', 'sum'), Leavers=('leavers', 'sum'),
+        Headcount=('operators', 'last'), Stations=('stations', 'last')).reindex(months)
+    by_month[['Joiners', 'Leavers']] = by_month[['Joiners', 'Leavers']].fillna(0).astype(int)
+    by_month[['Headcount', 'Stations']] = by_month[['Headcount', 'Stations']].ffill().astype(int)
+
+    opening = by_month['Headcount'].shift(1)
+    # The first month opens with the first version's headcount
+    opening.iloc[0] = df['operators'].iloc[0]
+    average = (opening + by_month['Headcount']) / 2
+    by_month['Attrition %'] = (by_month['Leavers'] / average.where(average > 0) * 100).fillna(0).round(1)
+    by_month = by_month.reset_index(names='Month')
+    by_month['Month'] = by_month['Month'].dt.strftime('%b %Y')
+    return by_month[ATTRITION_COLUMNS]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Roster versions, changes and monthly attrition")
+    parser.add_argument("--add", metavar="WORKBOOK", default=None,
+                        help="store a Master Sheet workbook as a version (as of its modification time)")
+    parser.add_argument("--changes", metavar="VERSION", default=None, help="list the changes of one version")
+    parser.add_argument("--root", default=VERSION_DIR)
+    args = parser.parse_args()
+
+    if args.add:
+        from pipeline import parse_roster
+        version = save_version(parse_roster(args.add), datetime.fromtimestamp(os.path.getmtime(args.add)),
+                               args.add, args.root)
+        print(f"Stored {version}" if version else "Unchanged since the latest version")
+    if args.changes:
+        print(load_changes(args.changes, args.root).to_string(index=False))
+    else:
+        index = read_index(args.root)
+        columns = ['version', 'as_of', 'operators', 'joiners', 'leavers', 'station_moves', 'backup_changes']
+        print(pd.DataFrame(index['versions'], columns=columns).to_string(index=False))
+        print()
+        print(monthly_attrition(args.root, index).to_string(index=False))
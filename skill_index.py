@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+from roster import canonical_ids
+from skill_table import to_long
+
+# Inverted skill index over the roster. Operators and station rows are coded as
+# integers and the skill edges are kept as two CSR arrays, so "which stations
+# can operator X run?" and "who can run station Y?" are O(k) slices instead of
+# scans over the 7 wide Name/ID pairs.
+
+MAIN_PRIORITY = 0  # the station's own operator; backups are 1..7
+
+
+def _names(values):
+    s = pd.Series(values, dtype=object)
+    return s.where(s.notna(), '').map(str).str.strip().to_numpy(dtype=object)
+
+
+def _csr(keys, values, priorities, n_keys):
+    order = np.lexsort((priorities, keys))
+    offsets = np.zeros(n_keys + 1, dtype=np.int64)
+    np.add.at(offsets, keys + 1, 1)
+    return np.cumsum(offsets), values[order], priorities[order]
+
+
+class SkillIndex:
+
+    def __init__(self, stations, operator_ids, operator_names, edge_station, edge_operator, edge_priority):
+        self.stations = stations.reset_index(drop=True)        # Area, Station, Name, ID per row
+        self.operator_ids = operator_ids                        # code -> Int64 ID
+        self.operator_names = operator_names                    # code -> name
+        self.operator_codes = {op_id: code for code, op_id in enumerate(operator_ids)}
+
+        station_codes = {}
+        for row, station in enumerate(self.stations['Station'].map(lambda s: str(s).strip())):
+            station_codes.setdefault(station.lower(), []).append(row)
+        self.station_codes = station_codes                      # lower-cased name -> rows
+
+        n_ops, n_stations = len(operator_ids), len(self.stations)
+        self._op_offsets, self._op_stations, self._op_priority = _csr(
+            edge_operator, edge_station, edge_priority, n_ops)
+        self._st_offsets, self._st_operators, self._st_priority = _csr(
+            edge_station, edge_operator, edge_priority, n_stations)
+
+    @classmethod
+    def from_roster(cls, roster):
+        # Main operators plus the long (station_id, operator_id, priority) edges
+        # of skill_table.to_long(); station_id is the roster row
+        stations, edges = to_long(roster)
+        main = stations[stations['ID'].notna()]
+        edges = edges[edges['operator_id'].notna()].sort_values('priority', kind='stable')
+
+        ids = np.concatenate([main['ID'].to_numpy(dtype=np.int64), edges['operator_id'].to_numpy(dtype=np.int64)])
+        names = np.concatenate([_names(main['Name']), _names(edges['operator_name'])])
+        rows = np.concatenate([main['station_id'].to_numpy(), edges['station_id'].to_numpy()]).astype(np.int64)
+        priorities = np.concatenate([np.full(len(main), MAIN_PRIORITY, dtype=np.int8),
+                                     edges['priority'].to_numpy(dtype=np.int8)])
+        codes, operator_ids = pd.factorize(ids)
+        # First name seen for each operator code (main station before backups)
+        first = pd.Series(np.arange(len(codes))).groupby(codes).first().to_numpy()
+
+        return cls(
+            stations[['Area', 'Station', 'Name', 'ID']],
+            np.asarray(operator_ids, dtype=np.int64),
+            names[first] if len(first) else np.array([], dtype=object),
+            rows,
+            codes.astype(np.int64),
+            priorities,
+        )
+
+    def __len__(self):
+        return len(self.stations)
+
+    def operator_code(self, operator_id):
+        # Integer code for an ID in any form ('363250', 363250, '363250.0'), or None
+        key = canonical_ids([operator_id]).iloc[0]
+        return None if key is pd.NA else self.operator_codes.get(int(key))
+
+    def stations_for(self, operator_id):
+        # Stations an operator can run, main station first then B1..B7
+        code = self.operator_code(operator_id)
+        if code is None:
+            return self._station_frame([], [])
+        lo, hi = self._op_offsets[code], self._op_offsets[code + 1]
+        return self._station_frame(self._op_stations[lo:hi], self._op_priority[lo:hi])
+
+    def operators_for(self, station, absent_ids=None):
+        # Qualified operators for a station (name or row number), in priority order.
+        # With absent_ids, each operator is flagged present/absent for the day.
+        rows = self._station_rows(station)
+        if absent_ids is not None:
+            absent_ids = set(canonical_ids(list(absent_ids)).dropna().tolist())
+        frames = []
+        for row in rows:
+            lo, hi = self._st_offsets[row], self._st_offsets[row + 1]
+            codes = self._st_operators[lo:hi]
+            frame = pd.DataFrame({
+                'Area': self.stations.at[row, 'Area'],
+                'Station': self.stations.at[row, 'Station'],
+                'Operator': self.operator_names[codes],
+                'Operator ID': self.operator_ids[codes],
+                'Priority': [_priority_label(p) for p in self._st_priority[lo:hi]],
+            })
+            if absent_ids is not None:
+                frame['Present'] = ~frame['Operator ID'].isin(absent_ids)
+            frames.append(frame)
+        if not frames:
+            columns = ['Area', 'Station', 'Operator', 'Operator ID', 'Priority']
+            return pd.DataFrame(columns=columns + (['Present'] if absent_ids is not None else []))
+        return pd.concat(frames, ignore_index=True)
+
+    def who_can_cover(self, station, absent_ids):
+        # Present backups for a station right now (its own operator excluded)
+        ops = self.operators_for(station, absent_ids)
+        return ops[ops['Present'] & (ops['Priority'] != 'Main')].reset_index(drop=True)
+
+    def _station_rows(self, station):
+        if isinstance(station, (int, np.integer)):
+            return [int(station)] if 0 <= station < len(self.stations) else []
+        return self.station_codes.get(str(station).strip().lower(), [])
+
+    def _station_frame(self, rows, priorities):
+        frame = self.stations.iloc[np.asarray(rows, dtype=np.int64)].reset_index(drop=True)
+        frame['Priority'] = [_priority_label(p) for p in priorities]
+        return frame
+
+
+def _priority_label(priority):
+    return 'Main' if priority == MAIN_PRIORITY else f'B{priority}'
@@ -0,0 +1,96 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from master_sheet import output_columns
+from roster import ID_DTYPE, backup_slots, canonicalize
+
+# Normalized roster: one row per station plus a long (station_id, operator_id,
+# priority) edge list, instead of 14 mostly-empty Multi_OPn columns.
+#   skill_table/stations.parquet     station_id, Area, Station, Name, ID
+#   skill_table/skill_edges.parquet  station_id, operator_id, priority, operator_name
+# Area/Station/operator_name are dictionary-encoded, so they are stored as codes.
+TABLE_DIR = "skill_table"
+STATIONS_FILE = "stations.parquet"
+EDGES_FILE = "skill_edges.parquet"
+
+
+def to_long(roster):
+    # Wide roster -> (stations, edges); blank backup slots produce no edge rows
+    roster = canonicalize(roster.reset_index(drop=True).copy())
+    station_ids = np.arange(len(roster), dtype=np.int32)
+
+    stations = roster[['Area', 'Station', 'Name', 'ID']].copy()
+    stations.insert(0, 'station_id', station_ids)
+
+    parts = []
+    for k, name_col, id_col in backup_slots(roster):
+        names = roster[name_col]
+        ids = roster[id_col]
+        filled = (names.notna() & (names.astype('string').str.strip() != '')) | ids.notna()
+        filled = filled.to_numpy(dtype=bool)
+        parts.append(pd.DataFrame({
+            'station_id': station_ids[filled],
+            'operator_id': ids[filled].reset_index(drop=True),
+            'priority': np.full(filled.sum(), k, dtype=np.int8),
+            'operator_name': names[filled].reset_index(drop=True),
+        }))
+    if parts:
+        edges = pd.concat(parts, ignore_index=True)
+    else:
+        edges = pd.DataFrame({'station_id': np.array([], dtype=np.int32),
+                              'operator_id': pd.array([], dtype=ID_DTYPE),
+                              'priority': np.array([], dtype=np.int8),
+                              'operator_name': pd.array([], dtype='string')})
+    edges = edges.sort_values(['station_id', 'priority'], kind='stable').reset_index(drop=True)
+    edges['operator_name'] = edges['operator_name'].astype('category')
+    return stations, edges
+
+
+def to_wide(stations, edges, n_slots=None):
+    # Compatibility view: rebuilds the current_employees.csv layout
+    n_slots = max(n_slots or 0, int(edges['priority'].max()) if len(edges) else 0)
+    wide = stations.drop(columns='station_id').reset_index(drop=True)
+    position = pd.Series(np.arange(len(stations)), index=stations['station_id'].to_numpy())
+    rows = position.reindex(edges['station_id'].to_numpy()).to_numpy()
+
+    for k in range(1, max(n_slots, 7) + 1):
+        slot = (edges['priority'] == k).to_numpy()
+        names = pd.Series(pd.NA, index=wide.index, dtype='string')
+        ids = pd.Series(pd.NA, index=wide.index, dtype=ID_DTYPE)
+        names.iloc[rows[slot]] = edges.loc[slot, 'operator_name'].astype('string').to_numpy()
+        ids.iloc[rows[slot]] = edges.loc[slot, 'operator_id'].to_numpy()
+        wide[f'Multi_OP{k}_Name'] = names
+        wide[f'Multi_OP{k}_ID'] = ids
+    return wide[output_columns(max(n_slots, 7))]
+
+
+def write_skill_table(roster, table_dir=TABLE_DIR):
+    stations, edges = to_long(roster)
+    os.makedirs(table_dir, exist_ok=True)
+    for frame, name in [(stations, STATIONS_FILE), (edges, EDGES_FILE)]:
+        target = os.path.join(table_dir, name)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        frame.to_parquet(tmp, index=False)
+        os.replace(tmp, target)
+    return stations, edges
+
+
+def read_skill_table(table_dir=TABLE_DIR):
+    stations = pd.read_parquet(os.path.join(table_dir, STATIONS_FILE))
+    edges = pd.read_parquet(os.path.join(table_dir, EDGES_FILE))
+    return stations, edges
+
+
+def load_wide(table_dir=TABLE_DIR):
+    return to_wide(*read_skill_table(table_dir))
+
+
+if __name__ == "__main__":
+    # python skill_table.py [output.csv]  - rebuild the wide CSV from the Parquet tables
+    output_csv = sys.argv[1] if len(sys.argv) > 1 else "current_employees.csv"
+    wide = load_wide()
+    wide.to_csv(output_csv, index=False)
+    print(f"'{output_csv}' rebuilt from '{TABLE_DIR}' with {len(wide)} stations")
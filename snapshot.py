@@ -0,0 +1,142 @@
+import json
+import os
+import shutil
+import time
+from datetime import date, datetime
+
+import pandas as pd
+import pyarrow.feather as feather
+
+from json_encoding import json_default
+from pipeline import STAGES
+from roster import ID_DTYPE
+from skill_index import SkillIndex
+
+# Published dashboard snapshots. Each version is a complete directory; the
+# CURRENT pointer file is swapped with os.replace, so readers only ever see a
+# fully written version.
+#   snapshots/CURRENT                 -> "v1768800000000000000"
+#   snapshots/v1768800000000000000/   current_df / absent_df / stage_df / plan / absent_ids .arrow + meta.json
+# Frames are uncompressed Arrow IPC (Feather v2) files that readers memory-map:
+# loading does no parsing, and string columns stay backed by the shared page
+# cache instead of a private copy in every dashboard worker.
+SNAPSHOT_DIR = "snapshots"
+POINTER = "CURRENT"
+KEEP_VERSIONS = 3
+
+_FRAMES = {
+    'current_df': 'current_df.arrow',
+    'absent_df': 'absent_df.arrow',
+    'stage_df': 'stage_df.arrow',
+    'coverage_plan': 'coverage_plan.arrow',
+    'coverage_by_area': 'coverage_by_area.arrow',
+    'absent_ids': 'absent_ids.arrow',
+}
+
+
+def current_version(root=SNAPSHOT_DIR):
+    try:
+        with open(os.path.join(root, POINTER), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish_snapshot(result, root=SNAPSHOT_DIR, keep=KEEP_VERSIONS):
+    # Writes a new version directory, then atomically points CURRENT at it
+    version = f"v{time.time_ns()}"
+    target = os.path.join(root, version)
+    os.makedirs(target)
+
+    frames = {
+        'current_df': result['current_df'],
+        'absent_df': result['absent_df'],
+        'stage_df': result['stage_df'],
+        'coverage_plan': result['coverage']['plan'],
+        'coverage_by_area': result['coverage']['by_area'],
+        'absent_ids': pd.DataFrame({'operator_id': pd.array(sorted(result['absent_ids']), dtype=ID_DTYPE)}),
+    }
+    for key, name in _FRAMES.items():
+        # Uncompressed, so the mapped file is the in-memory Arrow layout
+        feather.write_feather(frames[key].reset_index(drop=True), os.path.join(target, name),
+                              compression='uncompressed')
+
+    meta = {
+        'version': version,
+        'stages': list(result.get('stages', STAGES)),
+        'total': result['total'],
+        'absent_count': result['absent_count'],
+        'present_count': result['present_count'],
+        'covered': result['coverage']['covered'],
+        'uncovered': result['coverage']['uncovered'],
+        'report_path': result.get('report_path'),
+        'report_date': result.get('report_date'),
+        'data_as_of': result.get('data_as_of'),
+        'published_at': datetime.now(),
+    }
+    with open(os.path.join(target, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, default=json_default, indent=1)
+
+    pointer = os.path.join(root, POINTER)
+    tmp = f"{pointer}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp, pointer)
+
+    _prune(root, keep)
+    return version
+
+
+def _prune(root, keep):
+    # Old versions stay around briefly so readers that resolved them can finish.
+    # Files still mapped by a worker cannot be deleted on Windows; those
+    # directories are simply retried on the next publish.
+    versions = sorted(v for v in os.listdir(root) if v.startswith('v') and os.path.isdir(os.path.join(root, v)))
+    live = current_version(root)
+    for version in versions[:-keep]:
+        if version != live:
+            shutil.rmtree(os.path.join(root, version), ignore_errors=True)
+
+
+def _read_frame(path):
+    return feather.read_table(path, memory_map=True).to_pandas()
+
+
+def read_meta(version, root=SNAPSHOT_DIR):
+    # Totals and input dates of a version, without touching its frames
+    with open(os.path.join(root, version, "meta.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_snapshot(root=SNAPSHOT_DIR, version=None):
+    # Same shape as pipeline.aggregate() output, without recomputing anything heavy
+    version = version or current_version(root)
+    if version is None:
+        raise FileNotFoundError(f"No published snapshot in '{root}'")
+    source = os.path.join(root, version)
+    meta = read_meta(version, root)
+    frames = {key: _read_frame(os.path.join(source, name)) for key, name in _FRAMES.items()}
+
+    data = {
+        'current_df': frames['current_df'],
+        'absent_df': frames['absent_df'],
+        'stage_df': frames['stage_df'],
+        'coverage': {
+            'covered': meta['covered'],
+            'uncovered': meta['uncovered'],
+            'plan': frames['coverage_plan'],
+            'by_area': frames['coverage_by_area'],
+        },
+        'skill_index': SkillIndex.from_roster(frames['current_df']),
+        'absent_ids': set(frames['absent_ids']['operator_id'].dropna().tolist()),
+        'total': meta['total'],
+        'absent_count': meta['absent_count'],
+        'present_count': meta['present_count'],
+        'stages': meta['stages'],
+        'version': version,
+        'report_path': meta.get('report_path'),
+        'report_date': date.fromisoformat(meta['report_date']) if meta.get('report_date') else None,
+        'data_as_of': datetime.fromisoformat(meta['data_as_of']) if meta.get('data_as_of') else None,
+        'loaded_at': datetime.now(),
+    }
+    return data
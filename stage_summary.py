@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from roster import backup_slots
+
+SUMMARY_COLUMNS = ['Stage', 'P', 'W/B', 'N/B', 'Present %']
+
+
+def has_backup(df):
+    # True where any backup slot carries a non-blank name
+    mask = pd.Series(False, index=df.index)
+    for _, col, _ in backup_slots(df):
+        names = df[col]
+        mask |= names.notna() & (names.astype(str).str.strip() != '')
+    return mask
+
+
+def aggregate_stages(current_df, absent_df, areas=None):
+    # P / W/B / N/B / Present % for every Area in one groupby per frame.
+    # areas fixes the row order (and includes Areas with no operators); by
+    # default every Area in the roster is reported in order of appearance.
+    if areas is None:
+        areas = list(pd.unique(current_df['Area'].dropna()))
+    areas = list(areas)
+
+    ids = current_df['ID']
+    with_id = ids.notna() & (ids.astype('string').str.strip() != '')
+    totals = current_df.loc[with_id].groupby('Area', observed=True).size()
+    totals = totals.reindex(areas, fill_value=0)
+
+    absent = pd.DataFrame({'Area': absent_df['Area'], 'W/B': has_backup(absent_df)})
+    absent_counts = absent.groupby('Area', observed=True)['W/B'].agg(['size', 'sum'])
+    absent_counts = absent_counts.reindex(areas, fill_value=0)
+
+    total = totals.to_numpy()
+    absent_total = absent_counts['size'].to_numpy()
+    with_backup = absent_counts['sum'].to_numpy().astype(int)
+    present = total - absent_total
+
+    safe_total = np.where(total > 0, total, 1)
+    present_pct = np.where(total > 0, np.round(present / safe_total * 100), 0).astype(int)
+
+    return pd.DataFrame({
+        'Stage': areas,
+        'P': present,
+        'W/B': with_backup,
+        'N/B': absent_total - with_backup,
+        'Present %': present_pct,
+    }, columns=SUMMARY_COLUMNS)
+
+
+def rollup_stages(stage_frames, areas=None):
+    # Sums per-partition summaries (e.g. one per line/shift) into one table
+    # without touching roster rows; Present % is recomputed from the sums.
+    frames = [f for f in stage_frames if len(f)]
+    if not frames:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+    combined = pd.concat(frames, ignore_index=True)
+    if areas is None:
+        areas = list(pd.unique(combined['Stage']))
+    sums = combined.groupby('Stage', sort=False)[['P', 'W/B', 'N/B']].sum().reindex(areas, fill_value=0)
+
+    present = sums['P'].to_numpy()
+    total = present + sums['W/B'].to_numpy() + sums['N/B'].to_numpy()
+    safe_total = np.where(total > 0, total, 1)
+    present_pct = np.where(total > 0, np.round(present / safe_total * 100), 0).astype(int)
+
+    return pd.DataFrame({
+        'Stage': list(areas),
+        'P': present,
+        'W/B': sums['W/B'].to_numpy(),
+        'N/B': sums['N/B'].to_numpy(),
+        'Present %': present_pct,
+    }, columns=SUMMARY_COLUMNS)
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pipeline import aggregate, match_absent
+from roster import canonicalize
+
+
+def _roster():
+    # 102 runs FMS load and is also B1 for the two absent stations;
+    # 109 has no station of their own
+    return canonicalize(pd.DataFrame({
+        'Area': ['CG', 'CG', 'CG'],
+        'Station': ['CG1 Input', 'FMS load', 'CG2 Output'],
+        'Name': ['Main A', 'Main B', 'Main C'],
+        'ID': ['101', '102', '103'],
+        'Multi_OP1_Name': ['Main B', '', 'Main B'],
+        'Multi_OP1_ID': ['102', '', '102'],
+        'Multi_OP2_Name': ['Floater', '', ''],
+        'Multi_OP2_ID': ['109', '', ''],
+    }))
+
+
+def test_present_main_operator_is_not_used_as_a_backup():
+    roster = _roster()
+    absent_ids = {101, 103}
+    coverage = aggregate(roster, match_absent(roster, absent_ids), absent_ids)['coverage']
+
+    assert coverage['covered'] == 1
+    assert coverage['uncovered'] == 1
+    plan = coverage['plan'].set_index('ID')
+    assert plan.loc[101, 'Backup ID'] == 109
+    assert plan.loc[101, 'Priority'] == 'B2'
+    assert pd.isna(plan.loc[103, 'Backup ID'])
+
+
+def test_absent_main_operator_is_not_used_either():
+    # With 102 absent too, their station is empty as well and 109 is the only backup left
+    roster = _roster()
+    absent_ids = {101, 102, 103}
+    coverage = aggregate(roster, match_absent(roster, absent_ids), absent_ids)['coverage']
+
+    assert coverage['covered'] == 1
+    assert coverage['uncovered'] == 2
@@ -0,0 +1,80 @@
+import os
+import sys
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from attendance_history import ingest_report
+from risk import PRIOR_DAYS, absence_rates, simulate
+from roster import canonicalize
+
+
+def _roster(n=2, backups=None):
+    stations = pd.DataFrame({
+        'Area': ['CG', 'CG', 'CG'],
+        'Station': ['CG1 Input', 'FMS load', 'CG2 Output'],
+        'Name': ['Always here', 'Often away', 'Joined later'],
+        'ID': ['101', '102', '103'],
+        'Multi_OP1_Name': ['', '', ''],
+        'Multi_OP1_ID': ['', '', ''],
+        'Multi_OP2_Name': ['', '', ''],
+        'Multi_OP2_ID': ['', '', ''],
+    }).head(n)
+    for (row, slot), op_id in (backups or {}).items():
+        stations.loc[row, f'Multi_OP{slot}_Name'] = f'Backup {op_id}'
+        stations.loc[row, f'Multi_OP{slot}_ID'] = op_id
+    return canonicalize(stations)
+
+
+def test_zero_absence_operator_is_not_given_the_plant_rate(tmp_path):
+    roster = _roster()
+    start = date(2026, 1, 1)
+    for i in range(30):
+        day = start + timedelta(days=i)
+        # 102 is absent every other day, 101 never
+        statuses = [(102, 'A-A')] if i % 2 == 0 else []
+        ingest_report(f"absentReport {day.isoformat()}.xlsx", roster, str(tmp_path), statuses=statuses)
+
+    rates, plant_rate, n_days = absence_rates(str(tmp_path))
+    assert n_days == 30
+    assert plant_rate == 0.25
+    assert rates[101] == PRIOR_DAYS * plant_rate / (30 + PRIOR_DAYS)
+    assert rates[102] == (15 + PRIOR_DAYS * plant_rate) / (30 + PRIOR_DAYS)
+
+    stations = simulate(roster, rates, plant_rate, n_scenarios=100)['stations'].set_index('ID')
+    assert stations.loc[101, 'Absence %'] == 3.6
+    assert stations.loc[102, 'Absence %'] == 46.4
+    assert stations['Absence %'].dtype == 'float64'
+
+
+def test_rate_of_late_joiner_counts_only_days_on_roster(tmp_path):
+    start = date(2026, 1, 1)
+    for i in range(30):
+        day = start + timedelta(days=i)
+        # 103 joins on day 20 and is absent on their first two days;
+        # 109 is on no roster and absent once
+        roster = _roster(3 if i >= 20 else 2)
+        statuses = [(103, 'A-A')] if i in (20, 21) else [(109, 'A-A')] if i == 0 else []
+        ingest_report(f"absentReport {day.isoformat()}.xlsx", roster, str(tmp_path), statuses=statuses)
+
+    rates, plant_rate, n_days = absence_rates(str(tmp_path))
+    assert plant_rate == pytest.approx(2 / 70)
+    assert rates[103] == pytest.approx((2 + PRIOR_DAYS * plant_rate) / (10 + PRIOR_DAYS))
+    assert rates[101] == pytest.approx(PRIOR_DAYS * plant_rate / (30 + PRIOR_DAYS))
+    assert rates[109] == pytest.approx((1 + PRIOR_DAYS * plant_rate) / (30 + PRIOR_DAYS))
+
+
+def test_present_main_operator_is_never_a_backup():
+    # CG1 Input: B1 is 102, who runs FMS load; B2 is 109, who has no station
+    roster = _roster(2, {(0, 1): '102', (0, 2): '109'})
+
+    rates = pd.Series({101: 1.0, 102: 0.0, 109: 1.0})
+    stations = simulate(roster, rates, n_scenarios=100)['stations'].set_index('ID')
+    assert stations.loc[101, 'Uncovered %'] == 100.0
+    assert stations.loc[102, 'Uncovered %'] == 0.0
+
+    rates[109] = 0.0
+    stations = simulate(roster, rates, n_scenarios=100)['stations'].set_index('ID')
+    assert stations.loc[101, 'Uncovered %'] == 0.0
@@ -0,0 +1,227 @@
+import argparse
+import logging
+import os
+import threading
+import time
+import zipfile
+from datetime import datetime
+
+from attendance_history import ingest_report, report_date, stored_signature
+from daily_snapshots import DAILY_DIR, save_day
+from roster_versions import save_version
+from diagnostics import run_trace, span
+from pipeline import (ROSTER_EXCEL, STAGES, absent_ids_from, aggregate, discover_reports,
+                      match_absent, parse_absences, parse_roster)
+from snapshot import SNAPSHOT_DIR, publish_snapshot
+
+# Watch-folder daemon: when HR drops a new absentReport (or the roster workbook
+# is edited) only the affected stage is recomputed and a new snapshot is
+# published for the dashboard. inotify (via the optional watchdog package) is
+# used to wake up immediately; without it the folder is polled.
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # polling fallback
+    Observer = None
+
+POLL_INTERVAL = 2.0   # seconds between folder scans without inotify
+SETTLE_TIME = 1.0     # a file must keep the same (mtime, size) this long before it is read
+
+log = logging.getLogger("watcher")
+
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _complete_workbook(path):
+    # A half-copied .xlsx is not a readable zip yet
+    try:
+        with zipfile.ZipFile(path) as zf:
+            return zf.testzip() is None
+    except (zipfile.BadZipFile, OSError):
+        return False
+
+
+class _Wakeup(FileSystemEventHandler if Observer else object):
+
+    def __init__(self, event):
+        self.event = event
+
+    def on_any_event(self, event):
+        self.event.set()
+
+
+class FolderWatcher:
+
+    def __init__(self, folder=".", roster_excel=ROSTER_EXCEL, snapshot_dir=SNAPSHOT_DIR,
+                 stages=STAGES, history=True, settle=SETTLE_TIME, poll_interval=POLL_INTERVAL,
+                 daily_dir=DAILY_DIR):
+        self.folder = folder
+        self.roster_excel = roster_excel if os.path.isabs(roster_excel) else os.path.join(folder, roster_excel)
+        self.snapshot_dir = snapshot_dir
+        self.stages = stages
+        self.history = history
+        self.daily_dir = daily_dir
+        self.settle = settle
+        self.poll_interval = poll_interval
+
+        self._wake = threading.Event()
+        self._seen = {}       # path -> (signature, first time that signature was observed)
+        self._done = {}       # path -> signature last processed
+
+        # Cached stage outputs: the roster survives report changes and vice versa
+        self.roster = None
+        self.report_path = None
+        self.statuses = None
+
+    def _stable(self, path, now):
+        # Debounce: a changed file is ready once its signature has settled
+        signature = _signature(path)
+        if signature is None:
+            self._seen.pop(path, None)
+            return False
+        seen = self._seen.get(path)
+        if seen is None or seen[0] != signature:
+            self._seen[path] = (signature, now)
+            return False
+        return now - seen[1] >= self.settle and self._done.get(path) != signature
+
+    def _mark_done(self, path):
+        self._done[path] = self._seen[path][0]
+
+    def _failed(self, path, error):
+        # A file that cannot be opened right now (e.g. still locked by Excel)
+        # is retried on the next scan; anything else waits until it changes
+        log.warning("skipping %s: %s: %s", os.path.basename(path), type(error).__name__, error)
+        if not isinstance(error, OSError):
+            self._mark_done(path)
+
+    def poll_once(self, now=None):
+        # One scan of the folder; returns the published snapshot version, if any
+        now = time.monotonic() if now is None else now
+        roster_changed = report_changed = False
+
+        if os.path.exists(self.roster_excel) and self._stable(self.roster_excel, now):
+            if _complete_workbook(self.roster_excel):
+                started = time.perf_counter()
+                try:
+                    roster = parse_roster(self.roster_excel)
+                except Exception as e:
+                    # Keep serving the previous roster until the sheet is fixed
+                    self._failed(self.roster_excel, e)
+                    roster = None
+                else:
+                    self._mark_done(self.roster_excel)
+                if roster is not None:
+                    self.roster = roster
+                    roster_changed = True
+                    log.info("roster reparsed: %d operators in %.2fs", len(roster), time.perf_counter() - started)
+                    version = save_version(roster, datetime.fromtimestamp(os.path.getmtime(self.roster_excel)),
+                                           self.roster_excel)
+                    if version:
+                        log.info("stored roster version %s", version)
+
+        reports = discover_reports(self.folder)
+        latest = reports[-1] if reports else None
+        for path in reports:
+            if not self._stable(path, now) or not _complete_workbook(path):
+                continue
+            # After a restart every report looks new; days already in the history
+            # from an unchanged file are not parsed or rewritten again
+            ingested = self.history and stored_signature(report_date(path)) == list(self._seen[path][0])
+            if ingested and path != latest:
+                self._mark_done(path)
+                continue
+            if self.history and not ingested and self.roster is None:
+                # The history needs the roster; the report stays pending until it loads
+                continue
+            try:
+                statuses = parse_absences(path)
+                if self.history and not ingested:
+                    valid = statuses.dropna(subset=['operator_id'])
+                    ingest_report(path, self.roster, replace=True,
+                                  statuses=list(valid.itertuples(index=False, name=None)))
+            except Exception as e:
+                self._failed(path, e)
+                continue
+            self._mark_done(path)
+            if path == latest:
+                self.report_path, self.statuses = path, statuses
+                report_changed = True
+                log.info("absences reparsed from %s", os.path.basename(path))
+
+        if (roster_changed or report_changed) and self.roster is not None and self.statuses is not None:
+            return self.publish()
+        return None
+
+    def publish(self):
+        # Matching and aggregation are cheap; only the parsing above is skipped
+        absent_ids = absent_ids_from(self.statuses)
+        absent_df = match_absent(self.roster, absent_ids)
+        result = aggregate(self.roster, absent_df, absent_ids, self.stages)
+        result.update({
+            'report_path': self.report_path,
+            'report_date': report_date(self.report_path),
+            'data_as_of': datetime.fromtimestamp(max(os.path.getmtime(self.roster_excel),
+                                                     os.path.getmtime(self.report_path))),
+        })
+        with span('snapshot_publish', rows_in=result['current_df']):
+            version = publish_snapshot(result, self.snapshot_dir)
+        log.info("published snapshot %s (%d absent)", version, result['absent_count'])
+        if self.daily_dir:
+            # The same numbers stay browsable by date after the next report arrives
+            with span('daily_snapshot', rows_in=result['absent_df']):
+                save_day(result, root=self.daily_dir)
+        return version
+
+    def run_forever(self):
+        observer = None
+        if Observer is not None:
+            observer = Observer()
+            observer.schedule(_Wakeup(self._wake), self.folder, recursive=False)
+            observer.start()
+            log.info("watching %s with inotify", os.path.abspath(self.folder))
+        else:
+            log.info("watching %s by polling every %.1fs", os.path.abspath(self.folder), self.poll_interval)
+        try:
+            while True:
+                # All spans of one scan (parse, match, aggregate, publish) share a run
+                try:
+                    with run_trace('watcher'):
+                        self.poll_once()
+                except Exception:
+                    # The daemon keeps running; the next scan tries again
+                    log.exception("scan failed")
+                # Settling files need another look soon even without new events
+                timeout = self.settle / 2 if self._pending() else self.poll_interval
+                if observer is not None and not self._pending():
+                    timeout = max(timeout, 30.0)
+                self._wake.wait(timeout)
+                self._wake.clear()
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+    def _pending(self):
+        return any(self._done.get(path) != seen[0] for path, seen in self._seen.items())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute and publish dashboard snapshots when inputs change")
+    parser.add_argument("folder", nargs="?", default=".", help="input folder with the roster and absentReport files")
+    parser.add_argument("--roster", default=ROSTER_EXCEL)
+    parser.add_argument("--snapshots", default=SNAPSHOT_DIR)
+    parser.add_argument("--no-history", action="store_true", help="do not add reports to the attendance history")
+    parser.add_argument("--no-daily", action="store_true", help="do not save a daily snapshot per report")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    FolderWatcher(args.folder, args.roster, args.snapshots, history=not args.no_history,
+                  daily_dir=None if args.no_daily else DAILY_DIR).run_forever()